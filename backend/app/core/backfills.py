@@ -0,0 +1,42 @@
+import logging
+from typing import Awaitable, Callable
+from sqlalchemy import Column, DateTime, String, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from app.core.database import AsyncSessionLocal, Base, engine
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_lock(BACKFILL_LOCK_NAMESPACE, hashtext(name)) lets one worker run a backfill
+BACKFILL_LOCK_NAMESPACE = 7_240_004
+
+class DataBackfill(Base):
+    """ Data backfills that completed on this database, see run_once """
+    __tablename__ = "data_backfills"
+
+    name = Column(String, primary_key=True)
+    completedAt = Column(DateTime(timezone=True), server_default=func.now())
+
+async def run_once(name: str, backfill: Callable[[AsyncSession], Awaitable]):
+    """
+    Run a data backfill at startup unless it already completed on this database.
+    Workers starting together wait on an advisory lock and skip it once the first
+    one has recorded it. The backfill commits in batches with its own session and
+    is recorded only when it returns, so a failed one resumes on the next startup.
+    """
+    # Session-level lock on a dedicated connection: the backfill session commits
+    # and hands its connection back to the pool between batches
+    async with engine.connect() as lock_conn:
+        key = {"namespace": BACKFILL_LOCK_NAMESPACE, "name": name}
+        await lock_conn.execute(text("SELECT pg_advisory_lock(:namespace, hashtext(:name))"), key)
+        try:
+            async with AsyncSessionLocal() as session:
+                if await session.scalar(select(DataBackfill.name).where(DataBackfill.name == name)):
+                    return
+                await backfill(session)
+                await session.execute(insert(DataBackfill).values(name=name).on_conflict_do_nothing())
+                await session.commit()
+            logger.info(f"Backfill {name} done")
+        finally:
+            await lock_conn.execute(text("SELECT pg_advisory_unlock(:namespace, hashtext(:name))"), key)
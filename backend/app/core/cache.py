@@ -0,0 +1,59 @@
+import time
+from typing import Any, Awaitable, Callable, Hashable
+from app.core.config import settings
+
+class LocalCache:
+    """
+    Per-process cache of serialized GET payloads, grouped by entity namespace
+    ('portfolio', 'catalog', ...). Entries are evicted per namespace by the
+    invalidation bus (see app.core.invalidation) and expire after a TTL as a safety net.
+    """
+    def __init__(self):
+        self._entries: dict[str, dict[Hashable, tuple[float, Any]]] = {}
+        # Bumped on every eviction so that a load started before an eviction is not stored after it
+        self._generations: dict[str, int] = {}
+        # Called with the namespace after every eviction (derived snapshots rebuild from here)
+        self._listeners: list[Callable[[str], None]] = []
+
+    def on_invalidate(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def generation(self, namespace: str) -> int:
+        return self._generations.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable):
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries[namespace].pop(key, None)
+            return None
+        return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: float, generation: int = None):
+        if generation is not None and generation != self.generation(namespace):
+            return
+        self._entries.setdefault(namespace, {})[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, namespace: str):
+        self._generations[namespace] = self.generation(namespace) + 1
+        self._entries.pop(namespace, None)
+        for listener in self._listeners:
+            listener(namespace)
+
+    def clear(self):
+        for namespace in list(self._generations) + list(self._entries):
+            self.invalidate(namespace)
+
+cache = LocalCache()
+
+async def cached(namespace: str, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float = None):
+    """ Return the cached value for (namespace, key) or load and store it """
+    value = cache.get(namespace, key)
+    if value is not None:
+        return value
+    generation = cache.generation(namespace)
+    value = await loader()
+    cache.set(namespace, key, value, ttl or settings.CACHE_TTL_SECONDS, generation)
+    return value
@@ -1,15 +1,128 @@
+import logging
+import time
+from fastapi import Request, Response
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import CreateColumn
 from app.core.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+logger = logging.getLogger(__name__)
+
+# Primary: every write, and reads that must see the latest writes
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DATABASE_ECHO,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+)
 AsyncSessionLocal = async_sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Read replica with its own pool, so public GET traffic does not compete with admin writes.
+# Without DATABASE_READ_URL reads go to the primary.
+read_engine = create_async_engine(
+    settings.DATABASE_READ_URL,
+    echo=settings.DATABASE_ECHO,
+    pool_size=settings.DB_READ_POOL_SIZE,
+    max_overflow=settings.DB_READ_MAX_OVERFLOW,
+) if settings.DATABASE_READ_URL else engine
+ReadSessionLocal = async_sessionmaker(
+    read_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+# Set on write responses (epoch seconds); clients echo it on their next requests and are
+# read from the primary until then (read-your-writes). A header rather than a cookie:
+# the web app is served from another origin and does not send credentials
+PRIMARY_PIN_HEADER = "X-Primary-Until"
+
+_replica_down_until = 0.0
+
 Base = declarative_base()
 
+def replica_available() -> bool:
+    return read_engine is not engine and time.monotonic() >= _replica_down_until
+
+def read_sessionmaker() -> async_sessionmaker:
+    """ Session factory for reads outside a request (exports, background jobs) """
+    return ReadSessionLocal if replica_available() else AsyncSessionLocal
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        until = float(request.headers.get(PRIMARY_PIN_HEADER, 0))
+    except ValueError:
+        return False
+    # The value comes from the client: never pin for longer than one write would
+    now = time.time()
+    return now < until <= now + settings.READ_YOUR_WRITES_SECONDS
+
 async def get_db():
     """ Dependency for getting an async database session """
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_write_db(response: Response):
+    """
+    Session on the primary for endpoints that write.
+    Pins the client to the primary for READ_YOUR_WRITES_SECONDS so its next
+    GETs do not hit a replica that has not replayed the write yet.
+    """
+    if read_engine is not engine:
+        response.headers[PRIMARY_PIN_HEADER] = f"{time.time() + settings.READ_YOUR_WRITES_SECONDS:.3f}"
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def get_read_db(request: Request):
+    """
+    Session for read-only endpoints: the replica when configured and reachable,
+    otherwise the primary. A replica that fails to connect is skipped for
+    READ_REPLICA_RETRY_SECONDS.
+    """
+    global _replica_down_until
+    if replica_available() and not _pinned_to_primary(request):
+        async with ReadSessionLocal() as session:
+            try:
+                await session.connection()
+            except (OSError, DBAPIError) as e:
+                logger.warning(f"Read replica unavailable, falling back to primary: {e}")
+                _replica_down_until = time.monotonic() + settings.READ_REPLICA_RETRY_SECONDS
+            else:
+                yield session
+                return
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def sync_schema(conn):
+    """
+    Bring existing tables up to date with the models.
+    `create_all` only creates missing tables, so columns and indexes added to a
+    model later are created here. New columns must be nullable or have a server default.
+    Run with `await conn.run_sync(sync_schema)` after `create_all`.
+
+    A column with `info={"backfill": sql}` is added without its server default, filled
+    from `sql` (None leaves existing rows NULL), and only then given the default:
+    a creation timestamp must not stamp every existing row with the migration time.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if "backfill" in column.info and column.server_default is not None:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN IF NOT EXISTS "{column.name}" {column_type}'))
+                if column.info["backfill"] is not None:
+                    conn.execute(text(f'UPDATE "{table.name}" SET "{column.name}" = {column.info["backfill"]}'))
+                default = column.server_default.arg.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE "{table.name}" ALTER COLUMN "{column.name}" SET DEFAULT {default}'))
+                continue
+            column_ddl = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN IF NOT EXISTS {column_ddl}'))
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
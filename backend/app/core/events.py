@@ -0,0 +1,113 @@
+import asyncio
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.invalidation import invalidation_listener
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "admin_events"
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+MAX_PAYLOAD_BYTES = 7900
+
+@dataclass
+class Event:
+    id: Optional[int] # version of the changed row; None for control events, which clients must not resume from
+    type: str
+    data: dict
+
+    def encode(self) -> str:
+        """ One Server-Sent Events message """
+        lines = [f"id: {self.id}"] if self.id is not None else []
+        lines.append(f"event: {self.type}")
+        lines.append(f"data: {json.dumps(self.data, ensure_ascii=False, default=str)}")
+        return "\n".join(lines) + "\n\n"
+
+async def publish_event(session: AsyncSession, type: str, version: int, data: dict):
+    """
+    Queue a change event in the session's transaction; like cache invalidation it is
+    delivered to every worker on commit only. `version` is the row version after the
+    write (flush first) and becomes the SSE event id. Keep `data` small: ids and the
+    fields a list needs, clients pull full rows from the /changes endpoints.
+    """
+    payload = json.dumps({"id": version, "type": type, "data": data}, ensure_ascii=False, default=str)
+    if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+        payload = json.dumps({"id": version, "type": type, "data": {"id": data.get("id")}})
+    await session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+class Subscription:
+    def __init__(self, size: int):
+        self.queue: asyncio.Queue[Event] = asyncio.Queue(maxsize=size)
+        # Set when the client fell behind: its stream ends and EventSource reconnects with Last-Event-ID
+        self.overflowed = False
+
+class EventHub:
+    """
+    Per-process fan-out of change events to the SSE clients connected to this worker.
+    Each client has a bounded queue, so a slow client is disconnected instead of
+    holding memory or slowing down the others. The last EVENTS_REPLAY_SIZE events
+    are kept to resume a reconnecting client from its Last-Event-ID.
+
+    Every worker receives the same NOTIFY stream in commit order, so a client may
+    resume on any worker. When the id is no longer buffered (or events may have been
+    missed while the listener was reconnecting) the client gets a `reset` event and
+    must catch up through the /changes endpoints.
+    """
+    def __init__(self, replay_size: int, queue_size: int):
+        self.buffer: deque[Event] = deque(maxlen=replay_size)
+        self.subscribers: set[Subscription] = set()
+        self.queue_size = queue_size
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        if last_event_id is not None:
+            missed = self._replay(last_event_id)
+            if missed is None or len(missed) >= self.queue_size:
+                missed = [Event(None, "reset", {"reason": "replay"})]
+            for event in missed:
+                subscription.queue.put_nowait(event)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    def _replay(self, last_event_id: int) -> Optional[list[Event]]:
+        """ Events that arrived after `last_event_id`, None if it is not buffered """
+        events = list(self.buffer)
+        for index, event in enumerate(events):
+            if event.id == last_event_id:
+                return events[index + 1:]
+        return None
+
+    def publish(self, event: Event):
+        if event.id is not None:
+            self.buffer.append(event)
+        for subscription in list(self.subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.subscribers.discard(subscription)
+
+    def on_notify(self, payload: str):
+        try:
+            message = json.loads(payload)
+            event = Event(int(message["id"]), message["type"], message["data"])
+        except Exception:
+            logger.warning(f"Bad event payload {payload!r}")
+            return
+        self.publish(event)
+
+    def on_connect(self):
+        """ Events sent while the listener was disconnected are unknown: nothing before now can be replayed """
+        self.buffer.clear()
+        self.publish(Event(None, "reset", {"reason": "reconnected"}))
+
+event_hub = EventHub(settings.EVENTS_REPLAY_SIZE, settings.EVENTS_CLIENT_QUEUE_SIZE)
+invalidation_listener.listen(CHANNEL, event_hub.on_notify, event_hub.on_connect)
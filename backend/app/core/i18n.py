@@ -0,0 +1,33 @@
+import json
+from typing import Any, Literal, Optional
+
+LANGUAGES = ("ru", "uz", "en")
+DEFAULT_LANGUAGE = "ru"
+
+Lang = Literal["ru", "uz", "en"]
+
+def is_localized(value: Any) -> bool:
+    """ {"ru": ..., "uz": ...} style objects, as stored in title/description/specs/... """
+    return isinstance(value, dict) and bool(value) and all(key in LANGUAGES for key in value)
+
+def project(value: Any, lang: Optional[str]) -> Any:
+    """
+    Replace every {ru, uz, en} object in a JSON-like structure by its text in `lang`,
+    falling back to Russian and then to any non-empty translation.
+    `lang=None` returns the value unchanged.
+    """
+    if lang is None:
+        return value
+    if is_localized(value):
+        return value.get(lang) or value.get(DEFAULT_LANGUAGE) or next((v for v in value.values() if v), None)
+    if isinstance(value, dict):
+        return {key: project(item, lang) for key, item in value.items()}
+    if isinstance(value, list):
+        return [project(item, lang) for item in value]
+    return value
+
+def project_json(document: str, lang: Optional[str]) -> str:
+    """ `project` for a serialized JSON document; `lang=None` returns it unchanged, without decoding """
+    if lang is None:
+        return document
+    return json.dumps(project(json.loads(document), lang), ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Callable, Optional
+import asyncpg
+from sqlalchemy import Sequence, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import Base
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+# Identifies this worker in payloads, useful when debugging with `LISTEN cache_invalidation` in psql
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Global, monotonically increasing invalidation version. A jump in the sequence
+# seen by a listener means a message was missed and the whole cache is flushed.
+invalidation_seq = Sequence("cache_invalidation_seq", metadata=Base.metadata)
+
+async def publish(session: AsyncSession, *entities: str):
+    """
+    Queue invalidation messages in the session's transaction.
+    PostgreSQL delivers NOTIFY only on commit, so readers never see a message
+    for a write that was rolled back.
+    """
+    for entity in entities:
+        await session.execute(
+            text(
+                "SELECT pg_notify(:channel, json_build_object("
+                "'entity', CAST(:entity AS text), "
+                "'version', nextval('cache_invalidation_seq'), "
+                "'origin', CAST(:origin AS text))::text)"
+            ),
+            {"channel": CHANNEL, "entity": entity, "origin": WORKER_ID},
+        )
+
+async def commit_and_invalidate(session: AsyncSession, *entities: str):
+    """ Commit a write and evict the given entities in every worker """
+    await publish(session, *entities)
+    await session.commit()
+    # Evict locally right away, our own NOTIFY arrives a bit later
+    for entity in entities:
+        cache.invalidate(entity)
+
+def asyncpg_dsn(url: str) -> str:
+    """ SQLAlchemy URL -> plain libpq DSN understood by asyncpg """
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+class InvalidationListener:
+    """
+    Keeps a dedicated asyncpg connection LISTENing on CHANNEL and evicts local
+    cache namespaces. Reconnects with backoff; the cache is flushed on every
+    (re)connect and on version gaps because messages may have been lost.
+    """
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.last_version = None
+        self.connected = False
+        self.channels: dict[str, tuple[Callable[[str], None], Optional[Callable[[], None]]]] = {}
+
+    def listen(self, channel: str, callback: Callable[[str], None], on_connect: Callable[[], None] = None):
+        """
+        Also deliver the payloads of another channel over this connection, so other
+        NOTIFY consumers do not need a connection of their own. Register before run().
+        `on_connect` runs after every (re)connect: messages sent while disconnected are lost.
+        """
+        self.channels[channel] = (callback, on_connect)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        try:
+            message = json.loads(payload)
+            entity, version = message["entity"], int(message["version"])
+        except Exception:
+            logger.warning(f"Bad invalidation payload {payload!r}, flushing cache")
+            cache.clear()
+            return
+        if self.last_version is not None and version > self.last_version + 1:
+            # Gap: either a lost message or a rolled back nextval. Both are safe to handle by flushing.
+            cache.clear()
+        else:
+            cache.invalidate(entity)
+        self.last_version = max(version, self.last_version or 0)
+
+    async def run(self):
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                await connection.add_listener(CHANNEL, self._on_notify)
+                for channel, (callback, on_connect) in self.channels.items():
+                    await connection.add_listener(channel, lambda conn, pid, ch, payload, callback=callback: callback(payload))
+                    if on_connect is not None:
+                        on_connect()
+                self.last_version = None
+                # Anything published while we were disconnected is unknown
+                cache.clear()
+                self.connected = True
+                backoff = 1
+                logger.info("Cache invalidation listener connected")
+                while not connection.is_closed():
+                    await asyncio.sleep(settings.INVALIDATION_PING_SECONDS)
+                    # Detects half-open connections that would silently stop delivering
+                    await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+            finally:
+                self.connected = False
+                cache.clear()
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+invalidation_listener = InvalidationListener(asyncpg_dsn(settings.DATABASE_URL))
@@ -0,0 +1,34 @@
+from fastapi import Response
+from sqlalchemy import Select, Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Lean read path for hot GETs: PostgreSQL serializes the rows with json_agg and the
+# API caches and sends that string as is, instead of hydrating ORM instances and encoding them again.
+# The statements are static per endpoint, so SQLAlchemy's compiled cache and the asyncpg
+# dialect's prepared statement cache both hit after the first call on a connection.
+
+def json_rows(query: Select, *order_by: str) -> Select:
+    """
+    Wrap a column query into `SELECT json_agg(rows) FROM (query) rows`.
+    `order_by` takes output column names, "-name" for descending.
+    """
+    rows = query.subquery("rows")
+    record = rows.table_valued()
+    if order_by:
+        keys = [rows.c[name[1:]].desc() if name.startswith("-") else rows.c[name] for name in order_by]
+        aggregate = func.json_agg(aggregate_order_by(record, *keys))
+    else:
+        aggregate = func.json_agg(record)
+    return select(cast(func.coalesce(aggregate, literal_column("'[]'::json")), Text))
+
+async def fetch_json(session: AsyncSession, query: Select, *order_by: str) -> str:
+    """ Rows of `query` as a JSON array of objects keyed by column name """
+    return await session.scalar(json_rows(query, *order_by))
+
+def json_response(content: str) -> Response:
+    """ A JSON document that is already serialized (by the database, in the cache), sent without re-encoding """
+    return Response(content=content, media_type="application/json")
+
+def table_columns(model) -> list:
+    return list(model.__table__.c)
@@ -0,0 +1,46 @@
+import asyncio
+import logging
+from typing import Coroutine
+
+logger = logging.getLogger(__name__)
+
+class TaskRegistry:
+    """
+    Named background tasks of this process. Long-lived tasks (bot polling,
+    cache listener, periodic loops) stay registered so /readyz can report a
+    task that died; transient ones (a running broadcast) are dropped when they finish.
+    """
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def spawn(self, name: str, coro: Coroutine, transient: bool = False) -> asyncio.Task:
+        task = asyncio.create_task(coro, name=name)
+        self._tasks[name] = task
+        if transient:
+            task.add_done_callback(lambda t: self._tasks.pop(name, None) if self._tasks.get(name) is t else None)
+        return task
+
+    def get(self, name: str):
+        return self._tasks.get(name)
+
+    def is_running(self, name: str) -> bool:
+        task = self._tasks.get(name)
+        return task is not None and not task.done()
+
+    def status(self) -> dict[str, bool]:
+        return {name: not task.done() for name, task in self._tasks.items()}
+
+    async def cancel_all(self, timeout: float, exclude: tuple = ()):
+        """ Cancel every task but `exclude` and wait up to `timeout` for them to finish """
+        tasks = [task for name, task in self._tasks.items() if name not in exclude and not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                logger.warning(f"Background task {task.get_name()} did not stop in {timeout}s")
+
+background_tasks = TaskRegistry()
+
+# Set at the start of shutdown: /readyz answers 503 so the load balancer stops routing here
+state = {"draining": False}
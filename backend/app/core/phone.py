@@ -0,0 +1,23 @@
+import re
+from typing import Optional
+
+UZ_COUNTRY_CODE = "998"
+UZ_NATIONAL_LENGTH = 9
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Normalize a free-form phone number to E.164, assuming Uzbekistan when no
+    country code is given: "90 123-45-67", "8 (90) 1234567", "+998 90 123 45 67"
+    all become "+998901234567". Returns None when the input has no usable number.
+    """
+    if not phone:
+        return None
+    digits = re.sub(r"\D", "", phone)
+    if len(digits) == UZ_NATIONAL_LENGTH:
+        digits = UZ_COUNTRY_CODE + digits
+    elif len(digits) == UZ_NATIONAL_LENGTH + 1 and digits.startswith("8"):
+        # Old domestic trunk prefix: 8 90 123 45 67
+        digits = UZ_COUNTRY_CODE + digits[1:]
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from typing import Hashable
+
+class TokenBucketLimiter:
+    """
+    In-memory token buckets, one per key (client IP, telegram id, ...).
+    Each bucket holds up to `capacity` tokens and refills at `rate` tokens per second.
+    Per-process: with N workers the effective limit is up to N times higher,
+    which is fine for cheap abuse rejection.
+    """
+    def __init__(self, rate: float, capacity: float, max_keys: int = 100_000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: dict[Hashable, tuple[float, float]] = {}
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def allow(self, key: Hashable, cost: float = 1) -> bool:
+        """ Take `cost` tokens from the key's bucket, False if there are not enough """
+        now = time.monotonic()
+        tokens = self._tokens(key, now)
+        if tokens < cost:
+            self._buckets[key] = (tokens, now)
+            return False
+        if len(self._buckets) >= self.max_keys and key not in self._buckets:
+            self._prune(now)
+        self._buckets[key] = (tokens - cost, now)
+        return True
+
+    def retry_after(self, key: Hashable, cost: float = 1) -> float:
+        """ Seconds until `cost` tokens are available for the key """
+        missing = cost - self._tokens(key, time.monotonic())
+        return max(0.0, missing / self.rate)
+
+    def _prune(self, now: float):
+        # Buckets that have refilled completely carry no state worth keeping
+        full = [k for k in self._buckets if self._tokens(k, now) >= self.capacity]
+        for key in full:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+class AsyncRateLimiter:
+    """
+    Global pacing for outgoing calls: `acquire()` returns at most `rate` times
+    per second across all tasks sharing the limiter. `pause()` pushes every
+    waiter back, e.g. when the remote side answers with a RetryAfter.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+                now = time.monotonic()
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+    def pause(self, seconds: float):
+        self._next_slot = max(self._next_slot, time.monotonic() + seconds)
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import random
+import traceback
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+from zoneinfo import ZoneInfo
+import asyncpg
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint, update
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, Base
+from app.core.invalidation import WORKER_ID, asyncpg_dsn
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_lock key held by the worker that runs exclusive jobs
+SCHEDULER_LOCK_ID = 7_240_001
+
+class JobRun(Base):
+    """ History of exclusive job runs; (job, scheduledFor) is unique so an occurrence runs once """
+    __tablename__ = "job_runs"
+
+    id = Column(Integer, primary_key=True)
+    job = Column(String, nullable=False)
+    scheduledFor = Column(DateTime(timezone=True), nullable=False)
+    startedAt = Column(DateTime(timezone=True), nullable=True)
+    finishedAt = Column(DateTime(timezone=True), nullable=True)
+    status = Column(String, nullable=False, default="running") # 'running' | 'succeeded' | 'failed' | 'timeout'
+    error = Column(String, nullable=True)
+    worker = Column(String, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("job", "scheduledFor", name="uq_job_runs_job_scheduled_for"),
+    )
+
+class CronSchedule:
+    """
+    Five-field cron expression: minute hour day-of-month month day-of-week.
+    Fields accept `*`, `*/n`, `a`, `a/n` (a to the field maximum), `a-b`, `a-b/n` and
+    comma lists; day-of-week 0 is Sunday.
+    Like cron, a restricted day-of-month and day-of-week match when either matches.
+    """
+    RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(value, low, high) for value, (low, high) in zip(fields, self.RANGES)
+        )
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(value: str, low: int, high: int) -> set[int]:
+        result = set()
+        for part in value.split(","):
+            part, _, step = part.partition("/")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(bound) for bound in part.split("-"))
+            else:
+                # Like cron, a stepped single value runs to the end of the range
+                start = int(part)
+                end = high if step else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {value!r} out of range {low}-{high}")
+            if step and int(step) < 1:
+                raise ValueError(f"Cron field {value!r} has a step below 1")
+            result.update(range(start, end + 1, int(step) if step else 1))
+        return result
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime) -> datetime:
+        """ First matching minute strictly after `moment`, in moment's timezone """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+
+@dataclass
+class Job:
+    name: str
+    schedule: CronSchedule
+    func: Callable[[], Awaitable[None]]
+    timeout: float
+    jitter: float
+    # Exclusive jobs run once per occurrence on the leader; the others in every worker
+    exclusive: bool = True
+    next_run: Optional[datetime] = None
+    running: Optional[asyncio.Task] = field(default=None, repr=False)
+
+class Scheduler:
+    """
+    In-process cron scheduler. Every worker runs it; exclusive jobs only run in the
+    worker holding the PostgreSQL advisory lock SCHEDULER_LOCK_ID, on a dedicated
+    connection, and each occurrence is claimed in job_runs before it starts, so it
+    runs once even if two workers briefly both believe they lead.
+    Non-exclusive jobs (per-process work like cache pre-warming) run everywhere.
+    """
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.jobs: dict[str, Job] = {}
+        self.is_leader = False
+        self.tz = ZoneInfo(settings.TIMEZONE)
+
+    def job(self, name: str, cron: str, timeout: float = 300, jitter: float = 0, exclusive: bool = True):
+        """ Decorator registering an async function as a job """
+        def register(func: Callable[[], Awaitable[None]]):
+            self.jobs[name] = Job(name, CronSchedule(cron), func, timeout, jitter, exclusive)
+            return func
+        return register
+
+    async def run(self):
+        """ Background task: hold or wait for leadership and fire due jobs """
+        now = datetime.now(self.tz)
+        for job in self.jobs.values():
+            job.next_run = job.schedule.next_after(now)
+        # Local jobs do not depend on the lock connection
+        local = asyncio.create_task(self._loop(exclusive=False))
+        try:
+            await self._lead()
+        finally:
+            local.cancel()
+            await asyncio.gather(local, return_exceptions=True)
+
+    async def _lead(self):
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                backoff = 1
+                while not await connection.fetchval("SELECT pg_try_advisory_lock($1)", SCHEDULER_LOCK_ID):
+                    await asyncio.sleep(settings.SCHEDULER_LEADER_RETRY_SECONDS)
+                self.is_leader = True
+                logger.info(f"Scheduler leadership acquired by {WORKER_ID}")
+                leader = asyncio.create_task(self._loop(exclusive=True))
+                try:
+                    while not leader.done():
+                        await asyncio.sleep(settings.SCHEDULER_LEADER_RETRY_SECONDS)
+                        # The lock lives as long as this session; a dead connection means lost leadership
+                        await connection.execute("SELECT 1")
+                finally:
+                    leader.cancel()
+                    await asyncio.gather(leader, return_exceptions=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Scheduler leadership error: {e}")
+            finally:
+                if self.is_leader:
+                    logger.info("Scheduler leadership released")
+                self.is_leader = False
+                await self._cancel_running(exclusive=True)
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    async def _loop(self, exclusive: bool):
+        jobs = [job for job in self.jobs.values() if job.exclusive == exclusive]
+        if not jobs:
+            return
+        try:
+            while True:
+                now = datetime.now(self.tz)
+                for job in jobs:
+                    if job.next_run <= now:
+                        scheduled_for = job.next_run
+                        job.next_run = job.schedule.next_after(now)
+                        if job.running is not None and not job.running.done():
+                            logger.warning(f"Job {job.name} is still running, skipping the {scheduled_for} run")
+                            continue
+                        job.running = asyncio.create_task(self._run(job, scheduled_for))
+                wake_at = min(job.next_run for job in jobs)
+                await asyncio.sleep(max((wake_at - datetime.now(self.tz)).total_seconds(), 0.5))
+        finally:
+            await self._cancel_running(exclusive)
+
+    async def _cancel_running(self, exclusive: bool):
+        tasks = [
+            job.running for job in self.jobs.values()
+            if job.exclusive == exclusive and job.running is not None and not job.running.done()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, scheduled_for: datetime):
+        if job.jitter:
+            # Spread jobs sharing a schedule (and workers running local jobs) over a few seconds
+            await asyncio.sleep(random.uniform(0, job.jitter))
+
+        run_id = await self._claim(job, scheduled_for) if job.exclusive else None
+        if job.exclusive and run_id is None:
+            logger.info(f"Job {job.name} for {scheduled_for} was already run by another worker")
+            return
+
+        status, error = "succeeded", None
+        try:
+            await asyncio.wait_for(job.func(), job.timeout)
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"Timed out after {job.timeout}s"
+        except asyncio.CancelledError:
+            status, error = "failed", "Cancelled (leadership lost or shutdown)"
+            raise
+        except Exception as e:
+            status, error = "failed", "".join(traceback.format_exception(e))[-2000:]
+        finally:
+            if status != "succeeded":
+                logger.error(f"Job {job.name} {status}: {error}")
+            if run_id is not None:
+                await asyncio.shield(self._finish(run_id, status, error))
+
+    async def _claim(self, job: Job, scheduled_for: datetime) -> Optional[int]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                insert(JobRun)
+                .values(
+                    job=job.name,
+                    scheduledFor=scheduled_for,
+                    startedAt=datetime.now(timezone.utc),
+                    status="running",
+                    worker=WORKER_ID,
+                )
+                .on_conflict_do_nothing(constraint="uq_job_runs_job_scheduled_for")
+                .returning(JobRun.id)
+            )
+            run_id = result.scalar()
+            await session.commit()
+            return run_id
+
+    async def _finish(self, run_id: int, status: str, error: Optional[str]):
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(JobRun)
+                    .where(JobRun.id == run_id)
+                    .values(status=status, error=error, finishedAt=datetime.now(timezone.utc))
+                )
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Could not record job run {run_id}: {e}")
+
+scheduler = Scheduler(asyncpg_dsn(settings.DATABASE_URL))
@@ -0,0 +1,190 @@
+import hashlib
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, Sequence, String, delete, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+# One sequence for all content tables and tombstones, so a single `since` cursor orders every change
+change_version_seq = Sequence("change_version_seq", metadata=Base.metadata)
+NEXT_VERSION = text("nextval('change_version_seq')")
+# First transaction id not yet assigned when the writing statement started. Every
+# transaction that could have taken a lower version by then has a smaller id
+XID_HORIZON_SQL = "pg_snapshot_xmax(pg_current_snapshot())::text::bigint"
+
+# Columns maintained by the server; clients echo them back and they must not be written
+MANAGED_FIELDS = ("version", "updatedAt", "xidHorizon")
+
+class VersionedMixin:
+    """
+    Row version and modification time for delta sync.
+    `version` is taken from change_version_seq on every INSERT and UPDATE,
+    `xidHorizon` tells changes_since when no lower version can still appear.
+    """
+    version = Column(BigInteger, server_default=NEXT_VERSION, onupdate=func.nextval("change_version_seq"), index=True)
+    updatedAt = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Rows written before the column existed are settled
+    xidHorizon = Column(BigInteger, server_default=text(XID_HORIZON_SQL), onupdate=literal_column(XID_HORIZON_SQL), info={"backfill": "0"})
+
+    # Fetch the generated version back with RETURNING, the row is never reloaded lazily
+    __mapper_args__ = {"eager_defaults": True}
+
+class Tombstone(Base):
+    """ Deleted row marker, returned by the /changes endpoints """
+    __tablename__ = "tombstones"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False) # 'portfolio' | 'catalog' | ...
+    entityId = Column(String, nullable=False)
+    version = Column(BigInteger, server_default=NEXT_VERSION, nullable=False)
+    deletedAt = Column(DateTime(timezone=True), server_default=func.now())
+    xidHorizon = Column(BigInteger, server_default=text(XID_HORIZON_SQL), info={"backfill": "0"})
+
+    __table_args__ = (
+        Index("ix_tombstones_entity_version", "entity", "version"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
+
+def clean_payload(data: dict) -> dict:
+    for key in MANAGED_FIELDS:
+        data.pop(key, None)
+    return data
+
+def _canonical(value):
+    """ Normalize a value so payload JSON and loaded column values hash the same """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+def content_hash(model, values: dict) -> str:
+    """ sha256 over the client-writable columns of a row given as a dict """
+    content = {
+        attr.key: _canonical(values.get(attr.key))
+        for attr in model.__mapper__.column_attrs
+        if attr.key not in MANAGED_FIELDS
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+def row_values(row) -> dict:
+    return {attr.key: getattr(row, attr.key) for attr in row.__mapper__.column_attrs}
+
+async def get_for_update(session: AsyncSession, model, id):
+    """
+    Load a row with SELECT ... FOR UPDATE, so a precondition checked against it still
+    holds when the write commits: a concurrent writer of the same row waits until then.
+    """
+    if id is None:
+        return None
+    return await session.get(model, id, with_for_update=True, populate_existing=True)
+
+def check_if_match(row, if_match: Optional[str]):
+    """
+    If-Match precondition against the row version: 412 unless the header names the
+    stored version ("*" only requires the row to exist). No header, no check.
+    """
+    if if_match is None:
+        return
+    tags = [tag.strip().removeprefix("W/").strip('"') for tag in if_match.split(",")]
+    if row is not None and ("*" in tags or str(row.version) in tags):
+        return
+    raise HTTPException(
+        status_code=412,
+        detail="The item was changed by someone else, reload it and try again",
+        headers={"ETag": f'"{row.version}"'} if row is not None else None,
+    )
+
+async def conditional_merge(session: AsyncSession, model, data: dict, if_match: Optional[str] = None):
+    """
+    Upsert one row from a cleaned payload, for the single item POST endpoints.
+    Returns (row, changed). When the payload would not change the stored row nothing
+    is written and changed is False: the caller must skip commit and invalidation.
+
+    The content hash is computed from the loaded row rather than stored, because
+    importers and backfills update rows with plain SQL and a stored hash would go stale.
+    The row stays locked until the caller commits, so the If-Match check cannot race.
+    """
+    existing = await get_for_update(session, model, data.get("id"))
+    check_if_match(existing, if_match)
+    if existing is not None:
+        current = row_values(existing)
+        if content_hash(model, current) == content_hash(model, {**current, **data}):
+            return existing, False
+    return await session.merge(model(**data)), True
+
+async def sync_collection(session: AsyncSession, model, entity: str, items: list[dict], scope=None) -> list[Tombstone]:
+    """
+    Make the table match `items` (the admin panel's /batch semantics): rows
+    missing from the list are deleted and tombstoned, the others are upserted.
+    Unlike delete-all + insert, unchanged rows keep their version.
+    `scope` limits which existing rows may be deleted. Does not commit.
+    Returns the new tombstones; their versions are set once the session is flushed.
+    """
+    ids = [item["id"] for item in items if item.get("id") is not None]
+    condition = model.id.notin_(ids) if ids else model.id.isnot(None)
+    if scope is not None:
+        condition = condition & scope
+    result = await session.execute(delete(model).where(condition).returning(model.id))
+    tombstones = [Tombstone(entity=entity, entityId=str(deleted_id)) for deleted_id in result.scalars().all()]
+    session.add_all(tombstones)
+
+    # Load the surviving rows in one query so merge() below does not SELECT per item
+    if ids:
+        await session.execute(select(model).where(model.id.in_(ids)))
+    for item in items:
+        await session.merge(model(**clean_payload(dict(item))))
+    return tombstones
+
+async def changes_since(session: AsyncSession, model, entity: str, since: int, limit: int) -> dict:
+    """
+    Rows and tombstones with a version greater than `since`, oldest first.
+
+    Versions are assigned when a statement runs, not at commit, so a slow
+    transaction can commit a lower version after a higher one was already
+    returned. The returned cursor therefore stops before the first change whose
+    `xidHorizon` is above the oldest transaction still running: that transaction
+    may hold a lower version not visible yet. Such changes are sent again on the
+    next call, which is harmless because clients apply them as upserts.
+    """
+    # Taken before the rows: every transaction older than this has finished and is visible below
+    oldest_running = await session.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
+    rows = (await session.execute(
+        select(model).where(model.version > since).order_by(model.version).limit(limit + 1)
+    )).scalars().all()
+    tombstones = (await session.execute(
+        select(Tombstone)
+        .where(Tombstone.entity == entity, Tombstone.version > since)
+        .order_by(Tombstone.version)
+        .limit(limit + 1)
+    )).scalars().all()
+
+    merged = sorted(
+        [(row.version, row.xidHorizon, row) for row in rows]
+        + [(t.version, t.xidHorizon, t) for t in tombstones],
+        key=lambda change: change[0],
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    cursor: Optional[int] = since
+    for version, horizon, _ in merged:
+        if horizon is not None and horizon > oldest_running:
+            break
+        cursor = version
+
+    return {
+        "version": cursor,
+        "hasMore": has_more,
+        "changes": [change for _, _, change in merged if not isinstance(change, Tombstone)],
+        "deleted": [change.entityId for _, _, change in merged if isinstance(change, Tombstone)],
+    }
@@ -0,0 +1,128 @@
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Union
+from fastapi.responses import StreamingResponse
+
+# A column is either a dotted path into the flattened row ("calculatorData.area")
+# or a (header, getter) pair for derived values such as payment totals
+Column = Union[str, tuple[str, Callable[[dict], Any]]]
+
+CSV_FLUSH_ROWS = 500
+EXPORT_BATCH_SIZE = 500
+FILE_CHUNK_SIZE = 64 * 1024
+
+def model_to_dict(obj) -> dict:
+    """ ORM instance -> plain dict of its column values """
+    return {c.key: getattr(obj, c.key) for c in obj.__table__.columns}
+
+def flatten(value: Any, prefix: str = "") -> dict:
+    """
+    Flatten nested JSON into dotted keys: {"name": {"ru": "A"}} -> {"name.ru": "A"}.
+    Lists are kept as a single JSON text cell.
+    """
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    return {prefix: value}
+
+def localized(key: str, lang: str = "ru") -> tuple[str, Callable[[dict], Any]]:
+    """ Column for fields stored either as plain text or as {ru, uz} """
+    def getter(row: dict):
+        value = row.get(key)
+        if isinstance(value, dict):
+            return value.get(lang) or next(iter(value.values()), None)
+        return value
+    return (key, getter)
+
+def unflatten(flat: dict) -> dict:
+    """ Inverse of flatten: {"title.ru": "A"} -> {"title": {"ru": "A"}} """
+    nested = {}
+    for key, value in flat.items():
+        target = nested
+        *parents, leaf = key.split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return nested
+
+def cell(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def row_values(row: dict, columns: list[Column]) -> list:
+    flat = flatten(row)
+    values = []
+    for column in columns:
+        if isinstance(column, tuple):
+            values.append(cell(column[1](row)))
+        else:
+            values.append(cell(flat.get(column)))
+    return values
+
+def headers(columns: list[Column]) -> list[str]:
+    return [c[0] if isinstance(c, tuple) else c for c in columns]
+
+async def iter_csv(rows: AsyncIterator[dict], columns: list[Column]) -> AsyncIterator[bytes]:
+    """ Encode rows as CSV, yielding a chunk every CSV_FLUSH_ROWS rows """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so that Excel opens Cyrillic text correctly
+    buffer.write("\ufeff")
+    writer.writerow(headers(columns))
+    count = 0
+    async for row in rows:
+        writer.writerow(row_values(row, columns))
+        count += 1
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+async def iter_xlsx(rows: AsyncIterator[dict], columns: list[Column]) -> AsyncIterator[bytes]:
+    """
+    Write rows with openpyxl's write-only workbook, which spools rows to disk
+    instead of keeping the sheet in memory, then stream the finished file.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers(columns))
+    async for row in rows:
+        sheet.append(row_values(row, columns))
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await asyncio.to_thread(workbook.save, path)
+        with open(path, "rb") as f:
+            while chunk := f.read(FILE_CHUNK_SIZE):
+                yield chunk
+    finally:
+        os.remove(path)
+
+def export_response(rows: AsyncIterator[dict], columns: list[Column], fmt: str, filename: str) -> StreamingResponse:
+    if fmt == "xlsx":
+        body = iter_xlsx(rows, columns)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    else:
+        body = iter_csv(rows, columns)
+        media_type = "text/csv; charset=utf-8"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
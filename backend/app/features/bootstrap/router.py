@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+from app.core.i18n import Lang
+from app.features.bootstrap.service import bootstrap_snapshots
+
+router = APIRouter()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+@router.get("/")
+async def get_bootstrap(request: Request, lang: Optional[Lang] = None):
+    """
+    Settings, services, active stories, portfolio and catalog in one response for
+    Mini App startup. Served from a prebuilt gzipped snapshot with an ETag.
+    """
+    snapshot = await bootstrap_snapshots.get(lang)
+    gzipped = "gzip" in request.headers.get("accept-encoding", "")
+    # A strong ETag names one representation: the gzipped body gets its own
+    etag = f'"{snapshot.etag}-gz"' if gzipped else f'"{snapshot.etag}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if gzipped:
+        return Response(
+            content=snapshot.gzipped,
+            media_type="application/json",
+            headers={**headers, "Content-Encoding": "gzip"},
+        )
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
@@ -0,0 +1,101 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.lifecycle import background_tasks
+from app.features.catalog.router import catalog_json
+from app.features.portfolio.router import portfolio_json
+from app.features.services.router import services_json
+from app.features.settings.router import settings_json
+from app.features.stories.router import stories_json
+from app.features.stories.service import StoriesService
+
+logger = logging.getLogger(__name__)
+
+# Cache namespaces the snapshot is built from; an eviction of any of them triggers a rebuild
+SOURCES = ("settings", "services", "stories", "portfolio", "catalog")
+# Invalidations arriving within this window are folded into one rebuild
+REBUILD_DEBOUNCE_SECONDS = 0.2
+
+@dataclass
+class Snapshot:
+    body: bytes
+    gzipped: bytes
+    etag: str # content hash, unquoted: the router derives one ETag per encoding
+    built_at: float
+    generations: tuple
+
+class BootstrapSnapshots:
+    """
+    Serialized and gzipped startup payload per language, kept per process.
+    Built from the same cached collection loads as the individual GETs and rebuilt
+    in the background when one of SOURCES is evicted, so requests rarely wait for a build.
+    """
+    def __init__(self):
+        self._snapshots: dict[Optional[str], Snapshot] = {}
+        self._lock = asyncio.Lock()
+        cache.on_invalidate(self._on_invalidate)
+
+    def _generations(self) -> tuple:
+        return tuple(cache.generation(namespace) for namespace in SOURCES)
+
+    def _fresh(self, snapshot: Optional[Snapshot]) -> bool:
+        # The TTL also covers stories leaving the feed when they expire, which is not a write
+        return (
+            snapshot is not None
+            and snapshot.generations == self._generations()
+            and time.monotonic() - snapshot.built_at < settings.CACHE_TTL_SECONDS
+        )
+
+    async def get(self, lang: Optional[str]) -> Snapshot:
+        snapshot = self._snapshots.get(lang)
+        if self._fresh(snapshot):
+            return snapshot
+        async with self._lock:
+            snapshot = self._snapshots.get(lang)
+            if not self._fresh(snapshot):
+                snapshot = await self._build(lang)
+                self._snapshots[lang] = snapshot
+        return snapshot
+
+    async def _build(self, lang: Optional[str]) -> Snapshot:
+        # Taken before loading: an eviction during the build leaves the result stale
+        generations = self._generations()
+        async with AsyncSessionLocal() as session:
+            parts = {
+                "settings": await settings_json(session),
+                "services": await services_json(lang, session),
+                "stories": await stories_json(None, None, False, lang, StoriesService(session)),
+                "portfolio": await portfolio_json(lang, session),
+                "catalog": await catalog_json(lang, session),
+            }
+        # The parts are cached JSON documents: joined as they are, never decoded
+        body = ("{" + ",".join(f'"{name}":{part}' for name, part in parts.items()) + "}").encode()
+        return Snapshot(
+            body=body,
+            gzipped=gzip.compress(body, compresslevel=6),
+            # Content based, so a rebuild with unchanged data keeps answering 304
+            etag=hashlib.sha256(body).hexdigest()[:32],
+            built_at=time.monotonic(),
+            generations=generations,
+        )
+
+    def _on_invalidate(self, namespace: str):
+        if namespace in SOURCES and self._snapshots and not background_tasks.is_running("bootstrap-rebuild"):
+            background_tasks.spawn("bootstrap-rebuild", self._rebuild(), transient=True)
+
+    async def _rebuild(self):
+        await asyncio.sleep(REBUILD_DEBOUNCE_SECONDS)
+        for lang in list(self._snapshots):
+            try:
+                await self.get(lang)
+            except Exception as e:
+                logger.error(f"Bootstrap snapshot rebuild failed for lang={lang}: {e}")
+
+bootstrap_snapshots = BootstrapSnapshots()
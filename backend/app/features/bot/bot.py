@@ -1,29 +1,33 @@
 import logging
 import asyncio
-from aiogram import Bot, Dispatcher, types, F, Router
+from typing import Optional
+from aiogram import Dispatcher, types, F, Router
 from aiogram.filters import Command
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, WebAppInfo, InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.core.phone import normalize_phone
 from app.features.users.models import User
+from app.features.bot.client import get_bot
+from app.features.bot.middlewares import OrderedConcurrencyMiddleware
+from app.features.bot.notifications import notify_admin
 from sqlalchemy import select, update
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-dp = Dispatcher()
+# Handlers are registered on this router; the Dispatcher is built on first use by get_dispatcher()
+router = Router()
+concurrency = OrderedConcurrencyMiddleware(settings.BOT_HANDLER_CONCURRENCY)
+_dp: Optional[Dispatcher] = None
 
-# Change if your group ID is different, the one provided was -1003597948956
-ADMIN_GROUP_ID = -1003597948956
-
-async def notify_admin(message_text: str):
-    try:
-        await bot.send_message(chat_id=ADMIN_GROUP_ID, text=message_text, parse_mode="HTML")
-    except Exception as e:
-        logger.error(f"Error sending admin notification: {e}")
+def get_dispatcher() -> Dispatcher:
+    global _dp
+    if _dp is None:
+        _dp = Dispatcher()
+        _dp.update.outer_middleware(concurrency)
+        _dp.include_router(router)
+    return _dp
 
 # Translations
 MESSAGES = {
@@ -50,9 +54,14 @@ async def get_user(telegram_id: str):
         result = await session.execute(select(User).where(User.telegram_id == telegram_id))
         return result.scalars().first()
 
-@dp.message(Command("start"))
+@router.message(Command("start"))
 async def cmd_start(message: types.Message):
     user = await get_user(str(message.from_user.id))
+    if user is not None and user.is_active is False:
+        # Deactivated when a broadcast found the bot blocked; /start means it is unblocked
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(User).where(User.id == user.id).values(is_active=True))
+            await session.commit()
     
     # Language selection keyboard
     builder = InlineKeyboardBuilder()
@@ -64,7 +73,7 @@ async def cmd_start(message: types.Message):
     welcome_text = MESSAGES["ru"]["welcome"] # Default welcome
     await message.answer(welcome_text, reply_markup=builder.as_markup(), parse_mode="HTML")
 
-@dp.callback_query(F.data.startswith("lang_"))
+@router.callback_query(F.data.startswith("lang_"))
 async def process_language(callback: types.CallbackQuery):
     lang = callback.data.split("_")[1]
     telegram_id = str(callback.from_user.id)
@@ -95,7 +104,7 @@ async def process_language(callback: types.CallbackQuery):
     
     await callback.answer()
 
-@dp.message(F.contact)
+@router.message(F.contact)
 async def handle_contact(message: types.Message):
     contact = message.contact
     telegram_id = str(message.from_user.id)
@@ -107,6 +116,7 @@ async def handle_contact(message: types.Message):
         
         if user:
             user.phone = contact.phone_number
+            user.phone_normalized = normalize_phone(contact.phone_number)
             user.first_name = message.from_user.first_name
             user.last_name = message.from_user.last_name
         else:
@@ -116,6 +126,7 @@ async def handle_contact(message: types.Message):
                 first_name=message.from_user.first_name,
                 last_name=message.from_user.last_name,
                 phone=contact.phone_number,
+                phone_normalized=normalize_phone(contact.phone_number),
                 language="ru"
             )
             session.add(user)
@@ -136,8 +147,31 @@ async def handle_contact(message: types.Message):
 
 async def start_bot():
     logger.info("Starting Telegram Bot with Multi-language support...")
+    bot, dp = get_bot(), get_dispatcher()
     try:
         await bot.delete_webhook(drop_pending_updates=True)
-        await dp.start_polling(bot)
+        # Updates are handled as concurrent tasks, bounded and ordered per user by `concurrency`.
+        # Signals and the session are handled by stop_bot() from the app lifespan.
+        await dp.start_polling(
+            bot,
+            handle_as_tasks=True,
+            handle_signals=False,
+            close_bot_session=False,
+            allowed_updates=dp.resolve_used_update_types(),
+        )
     except Exception as e:
         logger.error(f"Bot error: {e}")
+
+async def stop_bot(polling_task: asyncio.Task):
+    """ Stop polling and let in-flight updates finish. The HTTP session stays open for close_bot() """
+    timeout = settings.BOT_SHUTDOWN_TIMEOUT_SECONDS
+    try:
+        await asyncio.wait_for(get_dispatcher().stop_polling(), timeout)
+    except (RuntimeError, asyncio.TimeoutError):
+        # Polling never started (bad token, network) or did not stop in time
+        pass
+    if not polling_task.done():
+        polling_task.cancel()
+    await asyncio.gather(polling_task, return_exceptions=True)
+    if not await concurrency.drain(timeout):
+        logger.warning(f"Bot shutdown: {concurrency.in_flight} updates still in flight")
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func, or_, select, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.lifecycle import background_tasks
+from app.core.ratelimit import AsyncRateLimiter
+from app.features.bot.client import get_bot
+from app.features.bot.models import Broadcast
+from app.features.users.models import User
+
+logger = logging.getLogger(__name__)
+
+SENT, FAILED, BLOCKED, DEFERRED = "sent", "failed", "blocked", "deferred"
+MAX_SEND_ATTEMPTS = 3
+# Flood-control pauses one send waits out before its recipient is deferred to a later pass
+MAX_RETRY_AFTER = 3
+# Passes over deferred recipients after the main one; those still deferred count as failed
+DEFERRED_PASSES = 2
+
+# Shared by every broadcast in this process: Telegram's limit is per bot, not per broadcast
+send_limiter = AsyncRateLimiter(settings.BROADCAST_RATE_PER_SECOND)
+
+def _lease_until() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(seconds=settings.BROADCAST_LEASE_SECONDS)
+
+async def claim(broadcast_id: int) -> bool:
+    """ Take the lease on a pending broadcast, or on a running one whose worker stopped renewing it """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Broadcast)
+            .where(
+                Broadcast.id == broadcast_id,
+                Broadcast.status != "finished",
+                or_(Broadcast.leaseUntil.is_(None), Broadcast.leaseUntil < func.now()),
+            )
+            .values(status="running", leaseUntil=_lease_until())
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+async def send_one(telegram_id: str, text: str) -> str:
+    # aiogram is only loaded by processes that actually send
+    from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+
+    attempts = flood_retries = 0
+    while attempts < MAX_SEND_ATTEMPTS:
+        # Waits out any flood-control pause before sending
+        await send_limiter.acquire()
+        try:
+            await get_bot().send_message(chat_id=telegram_id, text=text, parse_mode="HTML")
+            return SENT
+        except TelegramRetryAfter as e:
+            # Flood control applies to the whole bot, so every sender backs off.
+            # Not an attempt: the message itself is fine and will go through after the pause,
+            # but a recipient that keeps hitting it is retried after the rest of the broadcast
+            send_limiter.pause(e.retry_after)
+            flood_retries += 1
+            if flood_retries >= MAX_RETRY_AFTER:
+                return DEFERRED
+        except (TelegramNetworkError, TelegramServerError) as e:
+            attempts += 1
+            logger.warning(f"Broadcast send to {telegram_id} failed (attempt {attempts}): {e}")
+        except TelegramForbiddenError:
+            # The user blocked the bot or deleted their account
+            return BLOCKED
+        except Exception as e:
+            logger.warning(f"Broadcast send to {telegram_id} failed: {e}")
+            return FAILED
+    return FAILED
+
+def pick_text(texts: dict, language: str) -> str:
+    return texts.get(language) or texts.get("ru") or next(iter(texts.values()))
+
+async def _send_batch(texts: dict, users: list) -> list[tuple[int, str]]:
+    semaphore = asyncio.Semaphore(settings.BROADCAST_CONCURRENCY)
+
+    async def send(user):
+        async with semaphore:
+            return user.id, await send_one(user.telegram_id, pick_text(texts, user.language))
+
+    return await asyncio.gather(*(send(user) for user in users))
+
+async def _save_progress(broadcast_id: int, results: list[tuple[int, str]], last_user_id: Optional[int] = None):
+    """
+    Persist the cursor and counters after a batch, renew the lease and deactivate blocked users.
+    Deferred recipients are not counted yet; `last_user_id` None keeps the cursor (deferred passes)
+    """
+    outcomes = [outcome for _, outcome in results]
+    blocked_ids = [user_id for user_id, outcome in results if outcome == BLOCKED]
+    cursor = {"lastUserId": last_user_id} if last_user_id is not None else {}
+    async with AsyncSessionLocal() as session:
+        if blocked_ids:
+            await session.execute(update(User).where(User.id.in_(blocked_ids)).values(is_active=False))
+        await session.execute(
+            update(Broadcast)
+            .where(Broadcast.id == broadcast_id)
+            .values(
+                **cursor,
+                sent=Broadcast.sent + outcomes.count(SENT),
+                failed=Broadcast.failed + outcomes.count(FAILED),
+                blocked=Broadcast.blocked + outcomes.count(BLOCKED),
+                leaseUntil=_lease_until(),
+            )
+        )
+        await session.commit()
+
+async def run_broadcast(broadcast_id: int):
+    """
+    Send a broadcast to every active user, resuming after Broadcast.lastUserId.
+    Progress is stored per batch, so a crash re-sends at most one batch. Recipients
+    deferred by repeated flood control are retried after the main pass; a crash
+    before then skips them, as they are behind the cursor.
+    """
+    if not await claim(broadcast_id):
+        return
+    try:
+        async with AsyncSessionLocal() as session:
+            broadcast = await session.get(Broadcast, broadcast_id)
+            texts, last_user_id = broadcast.texts, broadcast.lastUserId or 0
+
+        logger.info(f"Broadcast {broadcast_id}: sending to users after id {last_user_id}")
+        async with AsyncSessionLocal() as reader:
+            # Server-side cursor: recipients are never loaded all at once
+            result = await reader.stream(
+                select(User.id, User.telegram_id, User.language)
+                .where(User.is_active.isnot(False), User.id > last_user_id)
+                .order_by(User.id)
+                .execution_options(yield_per=settings.BROADCAST_BATCH_SIZE)
+            )
+            deferred = []
+            async for users in result.partitions(settings.BROADCAST_BATCH_SIZE):
+                results = await _send_batch(texts, users)
+                deferred += [user for user, (_, outcome) in zip(users, results) if outcome == DEFERRED]
+                await _save_progress(broadcast_id, results, users[-1].id)
+
+        for _ in range(DEFERRED_PASSES):
+            if not deferred:
+                break
+            logger.info(f"Broadcast {broadcast_id}: retrying {len(deferred)} recipients deferred by flood control")
+            users, deferred = deferred, []
+            for start in range(0, len(users), settings.BROADCAST_BATCH_SIZE):
+                batch = users[start:start + settings.BROADCAST_BATCH_SIZE]
+                results = await _send_batch(texts, batch)
+                deferred += [user for user, (_, outcome) in zip(batch, results) if outcome == DEFERRED]
+                await _save_progress(broadcast_id, results)
+        if deferred:
+            await _save_progress(broadcast_id, [(user.id, FAILED) for user in deferred])
+
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id)
+                .values(status="finished", finishedAt=func.now(), leaseUntil=None)
+            )
+            await session.commit()
+        logger.info(f"Broadcast {broadcast_id} finished")
+    except asyncio.CancelledError:
+        # Shutdown: release the lease so the next worker resumes right away
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Broadcast).where(Broadcast.id == broadcast_id).values(leaseUntil=None))
+            await session.commit()
+        raise
+    except Exception as e:
+        # The lease expires and resume_broadcasts_loop picks the broadcast up again
+        logger.error(f"Broadcast {broadcast_id} error: {e}")
+
+def start_broadcast(broadcast_id: int):
+    name = f"broadcast-{broadcast_id}"
+    if not background_tasks.is_running(name):
+        background_tasks.spawn(name, run_broadcast(broadcast_id), transient=True)
+
+async def resume_broadcasts_loop():
+    """ Background task: start pending broadcasts and resume interrupted ones """
+    while True:
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    select(Broadcast.id).where(
+                        Broadcast.status != "finished",
+                        or_(Broadcast.leaseUntil.is_(None), Broadcast.leaseUntil < func.now()),
+                    )
+                )
+                for broadcast_id in result.scalars().all():
+                    start_broadcast(broadcast_id)
+        except Exception as e:
+            logger.error(f"Broadcast resume error: {e}")
+        await asyncio.sleep(settings.BROADCAST_LEASE_SECONDS)
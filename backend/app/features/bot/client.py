@@ -0,0 +1,27 @@
+from typing import TYPE_CHECKING, Optional
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+_bot: Optional["Bot"] = None
+
+def get_bot() -> "Bot":
+    """
+    The process-wide Bot, with one pooled HTTP session for every Telegram API call
+    (handlers, admin notifications, broadcasts). aiogram is imported on first use,
+    so API-only processes, CLI tools and tests never load it.
+    """
+    global _bot
+    if _bot is None:
+        from aiogram import Bot
+        from aiogram.client.session.aiohttp import AiohttpSession
+        _bot = Bot(token=settings.TELEGRAM_BOT_TOKEN, session=AiohttpSession(limit=settings.BOT_HTTP_POOL_SIZE))
+    return _bot
+
+async def close_bot():
+    """ Close the HTTP session, after everything that sends messages has stopped. No-op if no Bot was created """
+    global _bot
+    if _bot is not None:
+        await _bot.session.close()
+        _bot = None
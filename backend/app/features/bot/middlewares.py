@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+class OrderedConcurrencyMiddleware(BaseMiddleware):
+    """
+    Outer update middleware for polling with `handle_as_tasks=True`.
+    At most `limit` updates are handled at once, and updates of the same user
+    are handled one at a time, in arrival order.
+    """
+    def __init__(self, limit: int):
+        self._semaphore = asyncio.Semaphore(limit)
+        # Per-user locks, dropped when no update of that user is pending
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._pending: dict[int, int] = {}
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any],
+    ) -> Any:
+        user = data.get("event_from_user")
+        self.in_flight += 1
+        self._idle.clear()
+        try:
+            if user is None:
+                async with self._semaphore:
+                    return await handler(event, data)
+            # asyncio.Lock is FIFO and polling starts the tasks in update order
+            lock = self._locks.setdefault(user.id, asyncio.Lock())
+            self._pending[user.id] = self._pending.get(user.id, 0) + 1
+            try:
+                async with lock:
+                    async with self._semaphore:
+                        return await handler(event, data)
+            finally:
+                self._pending[user.id] -= 1
+                if not self._pending[user.id]:
+                    del self._pending[user.id]
+                    del self._locks[user.id]
+        finally:
+            self.in_flight -= 1
+            if not self.in_flight:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """ Wait for in-flight updates to finish. False on timeout """
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
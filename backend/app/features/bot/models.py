@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, JSON, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Broadcast(Base):
+    """ A message sent to every active bot user, see app.features.bot.broadcast """
+    __tablename__ = "broadcasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    texts = Column(JSON, nullable=False) # { "ru": "...", "uz": "..." }, picked by User.language
+    status = Column(String, default="pending") # 'pending' | 'running' | 'finished'
+    # Keyset cursor: every user with id <= lastUserId has been handled
+    lastUserId = Column(Integer, default=0)
+    sent = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    blocked = Column(Integer, default=0)
+    # The worker sending the broadcast extends the lease after every batch.
+    # An expired lease on a running broadcast means its worker died and another one resumes it.
+    leaseUntil = Column(DateTime(timezone=True), nullable=True)
+    createdAt = Column(DateTime(timezone=True), server_default=func.now())
+    finishedAt = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,38 @@
+import asyncio
+import logging
+from app.core.config import settings
+from app.features.bot.client import get_bot
+
+logger = logging.getLogger(__name__)
+
+# Admin group notifications are queued and sent by one worker, so request handlers
+# (POST /leads/, contact share) never wait on Telegram. The backlog is reported by /readyz.
+queue: asyncio.Queue = asyncio.Queue(maxsize=settings.NOTIFICATION_QUEUE_SIZE)
+
+async def notify_admin(message_text: str):
+    try:
+        queue.put_nowait(message_text)
+    except asyncio.QueueFull:
+        logger.error(f"Admin notification queue is full, dropping: {message_text[:100]}")
+
+def backlog() -> int:
+    return queue.qsize()
+
+async def notifications_worker():
+    """ Background task: send queued admin notifications one by one """
+    while True:
+        message_text = await queue.get()
+        try:
+            await get_bot().send_message(chat_id=settings.ADMIN_GROUP_ID, text=message_text, parse_mode="HTML")
+        except Exception as e:
+            logger.error(f"Error sending admin notification: {e}")
+        finally:
+            queue.task_done()
+
+async def drain(timeout: float) -> bool:
+    """ Wait until every queued notification was sent. False on timeout """
+    try:
+        await asyncio.wait_for(queue.join(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
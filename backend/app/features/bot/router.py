@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.core.database import get_read_db, get_write_db
+from app.features.bot.broadcast import start_broadcast
+from app.features.bot.models import Broadcast
+from app.features.bot.schemas import BroadcastCreate
+
+router = APIRouter()
+
+@router.get("/")
+async def get_all_broadcasts(db: AsyncSession = Depends(get_read_db)):
+    result = await db.execute(select(Broadcast).order_by(Broadcast.id.desc()))
+    return result.scalars().all()
+
+@router.post("/")
+async def create_broadcast(data: BroadcastCreate, db: AsyncSession = Depends(get_write_db)):
+    """
+    Send a message to every active bot user in their language.
+    Runs in background, poll GET /broadcasts/{id} for progress.
+    """
+    if not data.texts:
+        raise HTTPException(status_code=422, detail="At least one text is required")
+    broadcast = Broadcast(texts=data.texts, status="pending")
+    db.add(broadcast)
+    await db.commit()
+    await db.refresh(broadcast)
+    start_broadcast(broadcast.id)
+    return broadcast
+
+@router.get("/{broadcast_id}")
+async def get_broadcast(broadcast_id: int, db: AsyncSession = Depends(get_read_db)):
+    broadcast = await db.get(Broadcast, broadcast_id)
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return broadcast
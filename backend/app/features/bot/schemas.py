@@ -0,0 +1,5 @@
+from pydantic import BaseModel
+from typing import Dict
+
+class BroadcastCreate(BaseModel):
+    texts: Dict[str, str] # { "ru": "...", "uz": "..." }, HTML allowed
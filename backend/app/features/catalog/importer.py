@@ -0,0 +1,136 @@
+"""
+Bulk catalog import.
+
+Rows are validated one by one, loaded in chunks into a temporary staging
+table with COPY and merged into `catalog` with a single INSERT ... ON CONFLICT.
+Invalid rows are reported and skipped, they never abort the file.
+
+CLI:
+    python -m app.features.catalog.importer prices.csv
+    python -m app.features.catalog.importer prices.ndjson --format ndjson
+"""
+import asyncio
+import csv
+import json
+import sys
+from typing import IO, Iterator, Optional
+from pydantic import ValidationError
+from sqlalchemy import JSON, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.sync import XID_HORIZON_SQL
+from app.core.tabular import unflatten
+from app.features.catalog.models import CatalogItem
+from app.features.catalog.schemas import CatalogItemImport
+
+CHUNK_SIZE = 5000
+STAGING_TABLE = "catalog_import"
+IMPORT_COLUMNS = list(CatalogItemImport.model_fields)
+JSON_COLUMNS = {c.name for c in CatalogItem.__table__.columns if c.name in IMPORT_COLUMNS and isinstance(c.type, JSON)}
+MAX_REPORTED_ERRORS = 1000
+
+def _csv_value(column: str, value: str):
+    if value == "":
+        return None
+    # List columns (images, specs) are exported as JSON text cells
+    if column.split(".")[0] in JSON_COLUMNS and value[:1] in "[{":
+        return json.loads(value)
+    return value
+
+def iter_rows(f: IO[str], fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yield (line number, raw row, parse error) from an NDJSON or CSV text stream.
+    Parse errors are yielded rather than raised so that one bad line does not end the file.
+    """
+    if fmt == "ndjson":
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, json.loads(line), None
+            except ValueError as e:
+                yield line_no, None, str(e)
+        return
+    reader = csv.DictReader(f)
+    for row in reader:
+        try:
+            # Dotted headers ("title.ru", "title.uz") are produced by our own exports
+            yield reader.line_num, unflatten({k: _csv_value(k, v) for k, v in row.items() if k}), None
+        except ValueError as e:
+            yield reader.line_num, None, str(e)
+
+def _staging_record(item: CatalogItemImport, line_no: int) -> tuple:
+    values = []
+    for column in IMPORT_COLUMNS:
+        value = getattr(item, column)
+        values.append(json.dumps(value, ensure_ascii=False) if column in JSON_COLUMNS and value is not None else value)
+    return (*values, line_no)
+
+async def import_catalog(session: AsyncSession, f: IO[str], fmt: str = "csv") -> dict:
+    """
+    Import a price list into `catalog`. The caller commits.
+    Returns {"imported": n, "failed": n, "errors": [{"line": n, "error": "..."}]}.
+    """
+    conn = await session.connection()
+    columns_ddl = ", ".join(
+        f'"{c.name}" {c.type.compile(dialect=conn.dialect)}'
+        for c in CatalogItem.__table__.columns if c.name in IMPORT_COLUMNS
+    )
+    await conn.execute(text(f"CREATE TEMP TABLE {STAGING_TABLE} ({columns_ddl}, _line integer) ON COMMIT DROP"))
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+
+    errors = []
+    failed = 0
+    chunk = []
+
+    async def flush():
+        await driver.copy_records_to_table(STAGING_TABLE, records=chunk, columns=IMPORT_COLUMNS + ["_line"])
+        chunk.clear()
+
+    for line_no, row, error in iter_rows(f, fmt):
+        if error is None:
+            try:
+                chunk.append(_staging_record(CatalogItemImport.model_validate(row), line_no))
+            except ValidationError as e:
+                error = str(e)
+        if error is not None:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": error})
+            continue
+        if len(chunk) >= CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+
+    quoted = ", ".join(f'"{c}"' for c in IMPORT_COLUMNS)
+    updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in IMPORT_COLUMNS if c != "id")
+    # The ORM onupdate does not apply to raw SQL, bump the delta sync version explicitly
+    updates += f", \"version\" = nextval('change_version_seq'), \"updatedAt\" = now(), \"xidHorizon\" = {XID_HORIZON_SQL}"
+    # DISTINCT ON keeps the last occurrence of an id within the file
+    result = await conn.execute(text(
+        f"INSERT INTO catalog ({quoted}) "
+        f"SELECT DISTINCT ON (id) {quoted} FROM {STAGING_TABLE} ORDER BY id, _line DESC "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}"
+    ))
+    return {"imported": result.rowcount, "failed": failed, "errors": errors}
+
+async def main(path: str, fmt: str):
+    from app.core.database import AsyncSessionLocal
+    from app.core.invalidation import commit_and_invalidate
+
+    async with AsyncSessionLocal() as session:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            report = await import_catalog(session, f, fmt)
+        await commit_and_invalidate(session, "catalog")
+    print(f"Imported {report['imported']} rows, {report['failed']} failed")
+    for error in report["errors"]:
+        print(f"  line {error['line']}: {error['error']}")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        sys.exit("usage: python -m app.features.catalog.importer FILE [--format csv|ndjson]")
+    file_path = args[0]
+    file_format = args[args.index("--format") + 1] if "--format" in args else ("ndjson" if file_path.endswith((".ndjson", ".jsonl")) else "csv")
+    asyncio.run(main(file_path, file_format))
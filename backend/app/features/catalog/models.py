@@ -1,7 +1,8 @@
 from sqlalchemy import Column, String, Float, JSON
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class CatalogItem(Base):
+class CatalogItem(VersionedMixin, Base):
     __tablename__ = "catalog"
 
     id = Column(String, primary_key=True, index=True)
@@ -1,34 +1,98 @@
-from fastapi import APIRouter, Depends
+import io
+import tempfile
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
-from app.core.database import get_db
+from typing import Literal, Optional
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_write_db
+from app.core.i18n import Lang, project_json
+from app.core.lean import json_response
+from app.core.invalidation import commit_and_invalidate
+from app.core.sync import changes_since, clean_payload, conditional_merge, sync_collection
 from app.features.catalog.models import CatalogItem
+from app.features.catalog.repository import CatalogRepository
+from app.features.catalog.importer import import_catalog
 
 router = APIRouter()
 
+# Uploads larger than this are spooled to disk while they are received
+IMPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+async def catalog_json(lang: Optional[str], db: AsyncSession) -> str:
+    """ Every item as a JSON array, cached serialized; also used by the bootstrap snapshot """
+    async def load():
+        return await CatalogRepository(db).get_all_json()
+    async def load_projected():
+        return project_json(await cached("catalog", "all", load), lang)
+    # Single-language payloads are cached separately per language
+    return await cached("catalog", ("all", lang), load_projected)
+
 @router.get("/")
-async def get_all_catalog(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(CatalogItem))
-    items = result.scalars().all()
-    return items
+async def get_all_catalog(lang: Optional[Lang] = None, db: AsyncSession = Depends(get_db)):
+    # Cache fills read the primary: a replica may not have replayed the write that invalidated the cache yet
+    return json_response(await catalog_json(lang, db))
+
+@router.get("/changes")
+async def get_catalog_changes(
+    since: int = 0,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Delta sync: rows changed and ids deleted since version `since`.
+    Pass the returned `version` as the next `since`.
+    """
+    return await changes_since(db, CatalogItem, "catalog", since, limit)
 
 @router.post("/")
-async def create_or_update_catalog(data: dict, db: AsyncSession = Depends(get_db)):
-    new_item = CatalogItem(**data)
-    await db.merge(new_item)
-    await db.commit()
-    return {"message": "Saved successfully"}
+async def create_or_update_catalog(
+    data: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """ Upsert one item. `If-Match: "<version>"` makes it conditional (412 on conflict) """
+    item, changed = await conditional_merge(db, CatalogItem, clean_payload(data), if_match)
+    if changed:
+        await commit_and_invalidate(db, "catalog")
+    response.headers["ETag"] = f'"{item.version}"'
+    return {"message": "Saved successfully", "version": item.version, "changed": changed}
 
 @router.post("/batch")
-async def create_batch_catalog(data_list: list[dict], db: AsyncSession = Depends(get_db)):
+async def create_batch_catalog(data_list: list[dict], db: AsyncSession = Depends(get_write_db)):
     try:
-        await db.execute(delete(CatalogItem))
-        for data in data_list:
-            item = CatalogItem(**data)
-            db.add(item)
-        await db.commit()
+        await sync_collection(db, CatalogItem, "catalog", data_list)
+        await commit_and_invalidate(db, "catalog")
         return {"message": "Catalog synchronized"}
     except Exception as e:
         await db.rollback()
         raise e
 
+
+@router.post("/import")
+async def import_catalog_file(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = None,
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    Bulk upsert of a supplier price list sent as the raw request body (CSV or NDJSON).
+    Invalid rows are skipped and reported with their line numbers.
+    """
+    if format is None:
+        format = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        text_stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            report = await import_catalog(db, text_stream, format)
+            await commit_and_invalidate(db, "catalog")
+        except Exception as e:
+            await db.rollback()
+            raise e
+        finally:
+            text_stream.detach()
+    return report
@@ -1,4 +1,17 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Union
 
 class CatalogBase(BaseModel):
     pass
+
+class CatalogItemImport(BaseModel):
+    """ One row of a supplier price list, see app.features.catalog.importer """
+    id: str = Field(min_length=1)
+    category: str
+    title: Union[Dict[str, str], str]
+    description: Optional[Union[Dict[str, str], str]] = None
+    price: float = Field(ge=0)
+    image: Optional[str] = None
+    images: List[str] = []
+    specs: Optional[List[Dict[str, Any]]] = None
+    videoUrl: Optional[str] = None
@@ -0,0 +1,58 @@
+import json
+from typing import Optional
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.phone import normalize_phone
+from app.features.leads.models import Lead
+from app.features.projects.models import Project
+from app.features.users.models import User
+
+# (model, raw phone column, normalized phone column)
+PHONE_COLUMNS = (
+    (User, User.phone, User.phone_normalized),
+    (Lead, Lead.phone, Lead.phoneNormalized),
+    (Project, Project.phone, Project.phoneNormalized),
+)
+
+class ClientsRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def lookup(self, phone_normalized: str) -> dict:
+        """ User, leads and projects sharing a normalized phone, in one round trip over the phone indexes """
+        result = await self.session.execute(
+            text(
+                "SELECT "
+                "(SELECT row_to_json(u) FROM users u WHERE u.phone_normalized = :phone ORDER BY u.id LIMIT 1) AS user, "
+                "(SELECT coalesce(json_agg(l ORDER BY l.\"createdAt\" DESC), '[]') FROM leads l WHERE l.\"phoneNormalized\" = :phone) AS leads, "
+                "(SELECT coalesce(json_agg(p ORDER BY p.\"startDate\" DESC), '[]') FROM projects p WHERE p.\"phoneNormalized\" = :phone) AS projects"
+            ),
+            {"phone": phone_normalized},
+        )
+        row = result.one()
+        # asyncpg hands json back as text
+        return {key: json.loads(value) if isinstance(value, str) else value for key, value in row._mapping.items()}
+
+    async def backfill_batch(self, model, phone, phone_normalized, after_id, limit: int) -> Optional[object]:
+        """
+        Normalize phones of up to `limit` rows with id > after_id that have not been normalized yet.
+        Returns the last id seen, or None when there is nothing left.
+        """
+        result = await self.session.execute(
+            select(model.id, phone)
+            .where(phone.isnot(None), phone_normalized.is_(None), model.id > after_id)
+            .order_by(model.id)
+            .limit(limit)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        for row_id, raw_phone in rows:
+            normalized = normalize_phone(raw_phone)
+            if normalized:
+                await self.session.execute(
+                    update(model).where(model.id == row_id).values({phone_normalized: normalized})
+                )
+        await self.session.commit()
+        return rows[-1][0]
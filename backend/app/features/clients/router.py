@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_read_db
+from app.features.clients.service import ClientsService
+
+router = APIRouter()
+
+@router.get("/lookup")
+async def lookup_client(phone: str, db: AsyncSession = Depends(get_read_db)):
+    """
+    Is this caller an existing client? Returns the linked bot user, leads and
+    projects for any spelling of a phone number ("90 123 45 67", "+998901234567", ...).
+    """
+    client = await ClientsService(db).lookup(phone)
+    if client is None:
+        raise HTTPException(status_code=422, detail="Invalid phone number")
+    return client
@@ -0,0 +1,41 @@
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.phone import normalize_phone
+from app.features.clients.repository import PHONE_COLUMNS, ClientsRepository
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 500
+
+class ClientsService:
+    def __init__(self, session: AsyncSession):
+        self.repository = ClientsRepository(session)
+
+    async def lookup(self, phone: str) -> Optional[dict]:
+        """ Everything we know about a caller. None if the phone cannot be normalized """
+        phone_normalized = normalize_phone(phone)
+        if not phone_normalized:
+            return None
+        return {"phone": phone_normalized, **await self.repository.lookup(phone_normalized)}
+
+    async def backfill_phone_numbers(self) -> None:
+        """ Fill the normalized phone columns for rows written before they existed """
+        for model, phone, phone_normalized in PHONE_COLUMNS:
+            # Users have integer ids, leads and projects string ids
+            after_id = 0 if model.__table__.c.id.type.python_type is int else ""
+            while after_id is not None:
+                after_id = await self.repository.backfill_batch(model, phone, phone_normalized, after_id, BACKFILL_BATCH_SIZE)
+            logger.info(f"Phone backfill done for {model.__tablename__}")
+
+if __name__ == "__main__":
+    # python -m app.features.clients.service
+    from app.core.database import AsyncSessionLocal
+
+    async def main():
+        async with AsyncSessionLocal() as session:
+            await ClientsService(session).backfill_phone_numbers()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.core.events import event_hub
+from app.core.lifecycle import state
+
+router = APIRouter()
+
+async def stream(request: Request, resume_from: Optional[int]):
+    # Subscribed here, not in the endpoint: the finally below only runs once iteration has started
+    subscription = event_hub.subscribe(resume_from)
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        while not state["draining"]:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    return
+                # Comment line: keeps proxies from timing out the idle connection
+                yield ": ping\n\n"
+                continue
+            yield event.encode()
+            if subscription.overflowed and subscription.queue.empty():
+                return
+    finally:
+        event_hub.unsubscribe(subscription)
+
+@router.get("/")
+async def get_events(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    since: Optional[int] = None,
+):
+    """
+    Server-Sent Events stream of admin changes: `lead.created`, `lead.status_changed`,
+    `lead.updated`, `project.created`, `project.payment_added`, `project.updated` and
+    `project.deleted`, each with the row version as event id. Events carry ids and
+    list fields only; pull full rows with the /changes endpoints.
+
+    A reconnecting EventSource sends Last-Event-ID and gets the missed events replayed
+    (`since` does the same for a first connection). `reset` means events were missed
+    and the client must catch up through /changes.
+    """
+    if len(event_hub.subscribers) >= settings.EVENTS_MAX_CLIENTS:
+        raise HTTPException(status_code=503, detail="Too many event streams", headers={"Retry-After": "30"})
+    resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else since
+    return StreamingResponse(
+        stream(request, resume_from),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx must pass each event through as it is written
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
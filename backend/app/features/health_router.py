@@ -0,0 +1,63 @@
+import asyncio
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.core.config import settings
+from app.core.database import engine, read_engine
+from app.core.events import event_hub
+from app.core.invalidation import invalidation_listener
+from app.core.lifecycle import background_tasks, state
+from app.core.scheduler import scheduler
+from app.features.bot import notifications
+
+router = APIRouter()
+
+def pool_stats(db_engine) -> dict:
+    pool = db_engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checkedOut": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkedIn": pool.checkedin(),
+    }
+
+async def ping(db_engine) -> bool:
+    try:
+        async with asyncio.timeout(settings.READINESS_DB_TIMEOUT_SECONDS):
+            async with db_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+@router.get("/healthz")
+async def healthz():
+    """ Liveness: the event loop answers. Never touches the database """
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    """
+    Readiness: 503 while draining or when the primary database does not answer in time.
+    Bot, cache listener and replica state are reported but do not take the API out of rotation.
+    """
+    database = await ping(engine)
+    body = {
+        "status": "ready",
+        "draining": state["draining"],
+        "database": {"primary": database, "pool": pool_stats(engine)},
+        "bot": background_tasks.is_running("bot") if settings.BOT_POLLING_ENABLED else None,
+        "cacheListener": invalidation_listener.connected,
+        "schedulerLeader": scheduler.is_leader,
+        "notificationBacklog": notifications.backlog(),
+        "eventClients": len(event_hub.subscribers),
+        "tasks": background_tasks.status(),
+    }
+    if read_engine is not engine:
+        body["database"]["replica"] = await ping(read_engine)
+        body["database"]["replicaPool"] = pool_stats(read_engine)
+
+    if state["draining"] or not database:
+        body["status"] = "unavailable"
+        return JSONResponse(status_code=503, content=body)
+    return body
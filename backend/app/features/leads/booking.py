@@ -0,0 +1,144 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.features.leads.repository import LeadsRepository
+
+logger = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock(BOOKING_LOCK_NAMESPACE, day ordinal) serializes reservations of one day
+BOOKING_LOCK_NAMESPACE = 7_240_002
+BACKFILL_BATCH_SIZE = 500
+
+# Formats seen in bookingData: the admin panel and the Mini App use ru-RU locale strings
+DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%d.%m.%y")
+TIME_FORMATS = ("%H:%M", "%H:%M:%S", "%H.%M")
+
+def local_tz() -> ZoneInfo:
+    return ZoneInfo(settings.TIMEZONE)
+
+def _parse(value: str, formats: tuple) -> Optional[datetime]:
+    for fmt in formats:
+        try:
+            return datetime.strptime(value.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+def parse_booking_time(date_value, time_value) -> Optional[datetime]:
+    """ 'dd.mm.yyyy' + 'HH:MM' style strings -> aware datetime in TIMEZONE, None if either is unparseable """
+    if not isinstance(date_value, str) or not isinstance(time_value, str):
+        return None
+    day = _parse(date_value, DATE_FORMATS)
+    clock = _parse(time_value, TIME_FORMATS)
+    if day is None or clock is None:
+        return None
+    return datetime.combine(day.date(), clock.time(), tzinfo=local_tz())
+
+def apply_booking_time(data: dict) -> dict:
+    """
+    Set `bookingAt` of a lead payload from an explicit ISO `bookingAt` or from
+    bookingData {date, time}. Payloads carrying neither are left alone, so a
+    partial update does not clear the appointment.
+    """
+    if "bookingAt" not in data and "bookingData" not in data:
+        return data
+    value = data.get("bookingAt")
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="bookingAt must be an ISO 8601 datetime")
+        data["bookingAt"] = parsed if parsed.tzinfo else parsed.replace(tzinfo=local_tz())
+    elif not isinstance(value, datetime):
+        booking = data.get("bookingData")
+        data["bookingAt"] = parse_booking_time(booking.get("date"), booking.get("time")) if isinstance(booking, dict) else None
+    return data
+
+def day_slots(day: date) -> list[datetime]:
+    """ Slot start times of a day, empty on days off """
+    if day.weekday() in settings.BOOKING_DAYS_OFF:
+        return []
+    return [datetime.combine(day, time.fromisoformat(slot), tzinfo=local_tz()) for slot in settings.BOOKING_SLOTS]
+
+def _bounds(first: date, last: date) -> tuple[datetime, datetime]:
+    tz = local_tz()
+    return datetime.combine(first, time.min, tzinfo=tz), datetime.combine(last + timedelta(days=1), time.min, tzinfo=tz)
+
+async def availability(session: AsyncSession, date_from: date, date_to: date) -> list[dict]:
+    """ Free capacity per day and slot in [date_from, date_to], from one range query """
+    tz = local_tz()
+    start, end = _bounds(date_from, date_to)
+    counts = await LeadsRepository(session).count_bookings(start, end)
+    per_day: dict[date, int] = defaultdict(int)
+    for booking_at, count in counts.items():
+        per_day[booking_at.astimezone(tz).date()] += count
+
+    now = datetime.now(tz)
+    days = []
+    day = date_from
+    while day <= date_to:
+        day_left = settings.BOOKING_DAY_CAPACITY - per_day[day]
+        slots = []
+        for slot in day_slots(day):
+            booked = counts.get(slot, 0)
+            free = min(settings.BOOKING_SLOT_CAPACITY - booked, day_left) if slot > now else 0
+            slots.append({
+                "time": slot.strftime("%H:%M"),
+                "start": slot.isoformat(),
+                "booked": booked,
+                "capacity": settings.BOOKING_SLOT_CAPACITY,
+                "free": max(free, 0),
+            })
+        days.append({
+            "date": day.isoformat(),
+            "booked": per_day[day],
+            "capacity": settings.BOOKING_DAY_CAPACITY if slots else 0,
+            "slots": slots,
+        })
+        day += timedelta(days=1)
+    return days
+
+async def reserve_slot(session: AsyncSession, booking_at: datetime, exclude_id: Optional[str] = None):
+    """
+    Check that `booking_at` is a free slot while holding a transaction-level advisory
+    lock on its day. The lock is released on commit/rollback, so the caller must write
+    the lead in the same transaction. 422 off the grid or in the past, 409 when full.
+    """
+    tz = local_tz()
+    local = booking_at.astimezone(tz)
+    if local not in day_slots(local.date()):
+        raise HTTPException(status_code=422, detail="bookingAt is not a bookable measurement slot")
+    if local <= datetime.now(tz):
+        raise HTTPException(status_code=422, detail="bookingAt is in the past")
+
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(:namespace, :day)"),
+        {"namespace": BOOKING_LOCK_NAMESPACE, "day": local.date().toordinal()},
+    )
+    start, end = _bounds(local.date(), local.date())
+    counts = await LeadsRepository(session).count_bookings(start, end, exclude_id)
+    if counts.get(local, 0) >= settings.BOOKING_SLOT_CAPACITY or sum(counts.values()) >= settings.BOOKING_DAY_CAPACITY:
+        raise HTTPException(status_code=409, detail="This measurement slot is already fully booked")
+
+async def backfill_booking_times(session: AsyncSession) -> int:
+    """ Fill bookingAt of leads written before it existed, from their bookingData strings """
+    repository = LeadsRepository(session)
+    updated, after_id = 0, ""
+    while leads := await repository.get_without_booking_time(after_id, BACKFILL_BATCH_SIZE):
+        for lead in leads:
+            booking = lead.bookingData if isinstance(lead.bookingData, dict) else {}
+            booking_at = parse_booking_time(booking.get("date"), booking.get("time"))
+            if booking_at is not None:
+                lead.bookingAt = booking_at
+                updated += 1
+        await session.commit()
+        after_id = leads[-1].id
+    if updated:
+        logger.info(f"Booking time backfill: {updated} leads")
+    return updated
@@ -1,14 +1,21 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from datetime import datetime
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class Lead(Base):
+# Mini App lead ids are `lead-<Date.now()>`: the best record of when a lead older than createdAt was made
+ID_HAS_TIMESTAMP = "id ~ '^(lead-)?[0-9]{13}$'"
+ID_TIMESTAMP = "to_timestamp(substring(id from '([0-9]{13})$')::bigint / 1000.0)"
+
+class Lead(VersionedMixin, Base):
     __tablename__ = "leads"
 
     id = Column(String, primary_key=True, index=True)
     name = Column(JSON, nullable=True)
     phone = Column(String, nullable=True)
+    phoneNormalized = Column(String, nullable=True) # E.164, see app.core.phone
     source = Column(String) # 'calculator', 'booking', 'phone', 'other'
     status = Column(String, default='new') # 'new', 'contacted', 'measuring', 'contract', 'declined'
     date = Column(String)
@@ -18,3 +25,15 @@ class Lead(Base):
     calculatorData = Column(JSON, nullable=True)
     bookingData = Column(JSON, nullable=True)
     notes = Column(String, nullable=True)
+
+    createdAt = Column(
+        DateTime(timezone=True), server_default=func.now(), index=True,
+        info={"backfill": f"CASE WHEN {ID_HAS_TIMESTAMP} THEN {ID_TIMESTAMP} END"},
+    )
+    # Measurement appointment parsed from bookingData {date, time}, see app.features.leads.booking
+    bookingAt = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    __table_args__ = (
+        # Duplicate detection: same phone + source within LEAD_DEDUP_WINDOW_MINUTES
+        Index("ix_leads_phone_source_created_at", "phoneNormalized", "source", "createdAt"),
+    )
@@ -1,9 +1,68 @@
+from datetime import date, datetime, timedelta
+from typing import AsyncIterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func
 from sqlalchemy.future import select
+from app.core.tabular import EXPORT_BATCH_SIZE
 from app.features.leads.models import *
 
 class LeadsRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
-        
-    # Add generic CRUD methods here later depending on model
+
+    async def find_recent_duplicate(self, phone_normalized: str, source: Optional[str], since: datetime) -> Optional[Lead]:
+        """ Latest lead with the same phone and source created after `since`. Uses ix_leads_phone_source_created_at """
+        result = await self.session.execute(
+            select(Lead)
+            .where(Lead.phoneNormalized == phone_normalized, Lead.source == source, Lead.createdAt >= since)
+            .order_by(Lead.createdAt.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+    async def stream_for_export(
+        self, date_from: Optional[date], date_to: Optional[date], status: Optional[str]
+    ) -> AsyncIterator[Lead]:
+        """ Iterate leads through a server-side cursor, EXPORT_BATCH_SIZE rows at a time """
+        query = select(Lead).order_by(Lead.createdAt)
+        if date_from:
+            query = query.where(Lead.createdAt >= date_from)
+        if date_to:
+            query = query.where(Lead.createdAt < date_to + timedelta(days=1))
+        if status:
+            query = query.where(Lead.status == status)
+        result = await self.session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for lead in result.scalars():
+            yield lead
+
+    async def count_by_source(self, since: datetime) -> dict[Optional[str], int]:
+        """ Leads created after `since` per source """
+        result = await self.session.execute(
+            select(Lead.source, func.count()).where(Lead.createdAt >= since).group_by(Lead.source)
+        )
+        return dict(result.all())
+
+    async def count_with_status(self, status: str) -> int:
+        return await self.session.scalar(select(func.count()).select_from(Lead).where(Lead.status == status))
+
+    async def count_bookings(self, start: datetime, end: datetime, exclude_id: Optional[str] = None) -> dict[datetime, int]:
+        """ Active (not declined) bookings per appointment time in [start, end). Uses ix_leads_bookingAt """
+        query = (
+            select(Lead.bookingAt, func.count())
+            .where(Lead.bookingAt >= start, Lead.bookingAt < end, Lead.status.is_distinct_from("declined"))
+            .group_by(Lead.bookingAt)
+        )
+        if exclude_id is not None:
+            query = query.where(Lead.id != exclude_id)
+        result = await self.session.execute(query)
+        return dict(result.all())
+
+    async def get_without_booking_time(self, after_id: str, limit: int) -> list[Lead]:
+        """ Leads with bookingData but no bookingAt, keyset-paginated by id """
+        result = await self.session.execute(
+            select(Lead)
+            .where(Lead.bookingAt.is_(None), Lead.bookingData.isnot(None), Lead.id > after_id)
+            .order_by(Lead.id)
+            .limit(limit)
+        )
+        return result.scalars().all()
@@ -1,28 +1,122 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from datetime import date
+from typing import Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_write_db
+from app.core.phone import normalize_phone
+from app.core.sync import changes_since, check_if_match, clean_payload, conditional_merge, get_for_update
+from app.core.tabular import export_response
+from app.features.leads.booking import apply_booking_time, availability, reserve_slot
 from app.features.leads.models import Lead
-from app.features.bot.bot import notify_admin
+from app.features.leads.service import EXPORT_COLUMNS, LeadsService, check_rate_limit, export_rows
+from app.features.bot.notifications import notify_admin
 
 router = APIRouter()
 
 @router.get("/")
-async def get_all_leads(db: AsyncSession = Depends(get_db)):
+async def get_all_leads(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Lead))
     items = result.scalars().all()
     # Pydantic is cleaner but returning dict simplifies our quick setup
     return items
 
+@router.get("/export")
+async def export_leads(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    format: Literal["csv", "xlsx"] = "csv",
+):
+    """
+    Stream leads as CSV or XLSX for accounting, nested JSON flattened into columns.
+    """
+    rows = export_rows(date_from, date_to, status)
+    return export_response(rows, EXPORT_COLUMNS, format, "leads")
+
+@router.get("/changes")
+async def get_leads_changes(
+    since: int = 0,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delta sync: rows changed and ids deleted since version `since`.
+    Pass the returned `version` as the next `since`.
+    Read from the primary: the admin panel calls it right after an /events
+    notification, before a replica may have replayed that commit.
+    """
+    return await changes_since(db, Lead, "leads", since, limit)
+
+@router.get("/slots")
+async def get_booking_slots(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Measurement slot availability per day between `from` and `to` (inclusive, YYYY-MM-DD).
+    POST /leads/ with `bookingAt` (or bookingData {date, time}) set to a slot `start` reserves it.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=422, detail="`to` must not be before `from`")
+    if (date_to - date_from).days >= settings.BOOKING_MAX_RANGE_DAYS:
+        raise HTTPException(status_code=422, detail=f"At most {settings.BOOKING_MAX_RANGE_DAYS} days at once")
+    return await availability(db, date_from, date_to)
+
 @router.post("/")
-async def create_or_update_leads(data: dict, db: AsyncSession = Depends(get_db)):
-    # Check if this lead exists to avoid notifying on updates
-    existing_lead = await db.get(Lead, data.get('id'))
+async def create_or_update_leads(
+    data: dict,
+    request: Request,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    telegram_id = data.pop('telegramId', None) or request.headers.get('x-telegram-id')
+    # createdAt, version and updatedAt are set by the database, the admin panel echoes them back
+    data.pop('createdAt', None)
+    clean_payload(data)
+    # A partial update without the phone keeps the stored normalized phone
+    if 'phone' in data:
+        data['phoneNormalized'] = normalize_phone(data.get('phone'))
+    apply_booking_time(data)
+
+    # Check if this lead exists to avoid notifying on updates; locked until commit for If-Match
+    existing_lead = await get_for_update(db, Lead, data.get('id'))
     is_new = existing_lead is None
+    # Abuse protection covers new submissions only: status changes and other edits
+    # of an existing lead (the admin panel) are never throttled
+    if is_new:
+        check_rate_limit(request, telegram_id)
+    previous_status = None if is_new else existing_lead.status
+    # Admin edits can be made conditional with `If-Match: "<version>"`
+    check_if_match(existing_lead, if_match)
+
+    if is_new:
+        # A repeated submission (double tap, resend) updates the recent lead instead of creating a new one
+        service = LeadsService(db)
+        duplicate = await service.merge_into_duplicate(data)
+        if duplicate is not None:
+            changed = db.is_modified(duplicate)
+            if changed:
+                await db.flush()
+                await service.publish_change(duplicate, is_new=False, previous_status=duplicate.status)
+            await db.commit()
+            response.headers["ETag"] = f'"{duplicate.version}"'
+            return {"message": "Saved successfully", "id": duplicate.id, "version": duplicate.version, "changed": changed}
     
-    new_item = Lead(**data)
-    await db.merge(new_item)
-    await db.commit()
+    # Holds the day's booking lock until the commit below, so concurrent bookings cannot overbook
+    booking_at = data.get('bookingAt')
+    if booking_at is not None and (is_new or existing_lead.bookingAt != booking_at):
+        await reserve_slot(db, booking_at, exclude_id=data.get('id'))
+
+    item, changed = await conditional_merge(db, Lead, data)
+    if changed:
+        await db.flush()
+        await LeadsService(db).publish_change(item, is_new, previous_status)
+        await db.commit()
+    response.headers["ETag"] = f'"{item.version}"'
     
     if is_new:
         try:
@@ -63,13 +157,30 @@ async def create_or_update_leads(data: dict, db: AsyncSession = Depends(get_db))
         except Exception as e:
             print(f"Failed to notify admin: {e}")
 
-    return {"message": "Saved successfully"}
+    return {"message": "Saved successfully", "id": item.id, "version": item.version, "changed": changed}
 
 @router.post("/batch")
-async def create_batch_leads(data_list: list[dict], db: AsyncSession = Depends(get_db)):
+async def create_batch_leads(data_list: list[dict], db: AsyncSession = Depends(get_write_db)):
+    service = LeadsService(db)
+    # Load the existing rows in one query so get() and merge() below do not SELECT per item
+    ids = [data['id'] for data in data_list if data.get('id') is not None]
+    if ids:
+        await db.execute(select(Lead).where(Lead.id.in_(ids)))
     for data in data_list:
-        item = Lead(**data)
-        await db.merge(item)
+        data.pop('createdAt', None)
+        clean_payload(data)
+        if 'phone' in data:
+            data['phoneNormalized'] = normalize_phone(data.get('phone'))
+        # Admin edits: bookingAt follows bookingData, without capacity checks
+        apply_booking_time(data)
+        existing = await db.get(Lead, data.get('id')) if data.get('id') is not None else None
+        previous = (existing.version, existing.status) if existing is not None else None
+        item = await db.merge(Lead(**data))
+        await db.flush()
+        # Unchanged rows keep their version and are not announced
+        if previous is None or previous[0] != item.version:
+            previous_status = previous[1] if previous is not None else None
+            await service.publish_change(item, is_new=previous is None, previous_status=previous_status)
     await db.commit()
     return {"message": "Batch upserted"}
 
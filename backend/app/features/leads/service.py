@@ -1,6 +1,129 @@
+import ipaddress
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, Request
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import read_sessionmaker
+from app.core.events import publish_event
+from app.core.ratelimit import TokenBucketLimiter
+from app.core.tabular import localized, model_to_dict
+from app.features.bot.notifications import notify_admin
+from app.features.leads.models import Lead
+from app.features.leads.booking import reserve_slot
 from app.features.leads.repository import LeadsRepository
 
+EXPORT_COLUMNS = [
+    "id", localized("name"), "phone", "source", "status", "date", "time", "createdAt",
+    "calculatorData.area", "calculatorData.type", "calculatorData.level", "calculatorData.estimatedCost",
+    "bookingAt", "bookingData.date", "bookingData.time", "bookingData.address", "bookingData.comment",
+    "notes",
+]
+
+# Fields a repeated submission may overwrite on the lead it duplicates
+DUPLICATE_UPDATABLE_FIELDS = set(Lead.__table__.columns.keys()) - {"id", "status", "createdAt"}
+
+# pg_advisory_xact_lock(DEDUP_LOCK_NAMESPACE, hashtext(phone|source)) serializes duplicate checks
+DEDUP_LOCK_NAMESPACE = 7_240_003
+
+TRUSTED_PROXIES = [ipaddress.ip_network(network) for network in settings.TRUSTED_PROXY_NETWORKS]
+
+ip_limiter = TokenBucketLimiter(settings.LEAD_RATE_IP_PER_MINUTE / 60, settings.LEAD_RATE_IP_BURST)
+telegram_limiter = TokenBucketLimiter(settings.LEAD_RATE_TELEGRAM_PER_MINUTE / 60, settings.LEAD_RATE_TELEGRAM_BURST)
+
+def _trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    # nginx sets X-Real-IP (see nginx.conf); anyone else could send it to dodge the limit
+    if _trusted_proxy(peer):
+        return request.headers.get("x-real-ip") or peer
+    return peer
+
+def check_rate_limit(request: Request, telegram_id: Optional[str]):
+    """ Reject a new lead submission in memory, before anything is written. Raises 429 """
+    checks = [(ip_limiter, client_ip(request))]
+    if telegram_id:
+        checks.append((telegram_limiter, str(telegram_id)))
+    for limiter, key in checks:
+        if not limiter.allow(key):
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(limiter.retry_after(key)))},
+            )
+
+DIGEST_SOURCE_LABELS = {
+    "calculator": "📊 Расчет стоимости",
+    "booking": "📅 Запись на замер",
+    "catalog": "🛒 Заказ из каталога",
+    "phone": "📞 Телефон",
+    "other": "❓ Другое",
+}
+
 class LeadsService:
     def __init__(self, session: AsyncSession):
         self.repository = LeadsRepository(session)
+
+    async def merge_into_duplicate(self, data: dict) -> Optional[Lead]:
+        """
+        If a lead with the same normalized phone and source was created within
+        LEAD_DEDUP_WINDOW_MINUTES, update it with `data` and return it (uncommitted).
+
+        Holds a transaction-level advisory lock on phone + source, so two concurrent
+        submissions cannot both miss each other: the caller must write the lead in
+        the same transaction.
+        """
+        if not data.get("phoneNormalized"):
+            return None
+        await self.repository.session.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, hashtext(:key))"),
+            {"namespace": DEDUP_LOCK_NAMESPACE, "key": f"{data['phoneNormalized']}|{data.get('source') or ''}"},
+        )
+        since = datetime.now(timezone.utc) - timedelta(minutes=settings.LEAD_DEDUP_WINDOW_MINUTES)
+        duplicate = await self.repository.find_recent_duplicate(data["phoneNormalized"], data.get("source"), since)
+        if duplicate is None:
+            return None
+        if data.get("bookingAt") is not None and data["bookingAt"] != duplicate.bookingAt:
+            await reserve_slot(self.repository.session, data["bookingAt"], exclude_id=duplicate.id)
+        for key, value in data.items():
+            if key in DUPLICATE_UPDATABLE_FIELDS:
+                setattr(duplicate, key, value)
+        return duplicate
+
+    async def publish_change(self, lead: Lead, is_new: bool, previous_status: Optional[str] = None):
+        """ Admin panel event for a flushed lead write """
+        data = {"id": lead.id, "source": lead.source, "status": lead.status}
+        if is_new:
+            event = "lead.created"
+            data["bookingAt"] = lead.bookingAt
+        elif previous_status != lead.status:
+            event = "lead.status_changed"
+            data["previousStatus"] = previous_status
+        else:
+            event = "lead.updated"
+        await publish_event(self.repository.session, event, lead.version, data)
+
+    async def send_daily_digest(self):
+        """ Scheduled job: leads of the last 24 hours by source, to the admin group """
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        by_source = await self.repository.count_by_source(since)
+        unprocessed = await self.repository.count_with_status("new")
+        lines = [f"📈 <b>Заявки за сутки - Vicasa</b>\n", f"Всего: <b>{sum(by_source.values())}</b>"]
+        for source, count in sorted(by_source.items(), key=lambda item: -item[1]):
+            lines.append(f"• {DIGEST_SOURCE_LABELS.get(source, source or '—')}: {count}")
+        lines.append(f"\n⏳ Необработанных (статус «new»): <b>{unprocessed}</b>")
+        await notify_admin("\n".join(lines))
+
+async def export_rows(date_from: Optional[date], date_to: Optional[date], status: Optional[str]) -> AsyncIterator[dict]:
+    """ Own session: the response body is streamed after the request dependencies are closed """
+    async with read_sessionmaker()() as session:
+        async for lead in LeadsRepository(session).stream_for_export(date_from, date_to, status):
+            yield model_to_dict(lead)
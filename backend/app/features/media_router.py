@@ -1,23 +1,44 @@
+import base64
+import fcntl
+import json
+import logging
 import os
+import re
 import shutil
+import time
 import uuid
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Header
+from fastapi.responses import Response, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 UPLOAD_DIR = "static/uploads"
+# Resumable upload sessions live next to the finished files, so finalizing is an atomic rename
+INCOMING_DIR = os.path.join(UPLOAD_DIR, ".incoming")
+UPLOAD_ID = re.compile(r"[0-9a-f]{32}")
+# Received chunk bytes are written in pieces of this size, each in the threadpool
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# File IO below runs in the threadpool (run_in_threadpool): a slow disk must not stall the event loop
+
+def _save_upload(source, file_path: str):
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer)
 
 @router.post("/upload")
 async def upload_file(request: Request, file: UploadFile = File(...)):
     try:
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
         file_extension = os.path.splitext(file.filename)[1]
         unique_filename = f"{uuid.uuid4()}{file_extension}"
         file_path = os.path.join(UPLOAD_DIR, unique_filename)
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(_save_upload, file.file, file_path)
             
         # Return full URL
         base_url = str(request.base_url).rstrip('/')
@@ -29,18 +50,248 @@ async def upload_file(request: Request, file: UploadFile = File(...)):
 async def upload_multiple(request: Request, files: list[UploadFile] = File(...)):
     urls = []
     try:
-        os.makedirs(UPLOAD_DIR, exist_ok=True)
         base_url = str(request.base_url).rstrip('/')
         for file in files:
             file_extension = os.path.splitext(file.filename)[1]
             unique_filename = f"{uuid.uuid4()}{file_extension}"
             file_path = os.path.join(UPLOAD_DIR, unique_filename)
             
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            await run_in_threadpool(_save_upload, file.file, file_path)
             
             urls.append(f"{base_url}/static/uploads/{unique_filename}")
         
         return {"urls": urls}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# Resumable uploads (tus-style): POST /uploads creates a session, HEAD returns the stored
+# offset, PATCH appends a chunk at that offset, and the chunk that reaches Upload-Length
+# finalizes the file. Each session is "<id>.part" plus a "<id>.json" sidecar holding the
+# offset, which is only advanced after the chunk is fsynced.
+
+def _session_paths(upload_id: str) -> tuple[str, str]:
+    if not UPLOAD_ID.fullmatch(upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    base = os.path.join(INCOMING_DIR, upload_id)
+    return base + ".part", base + ".json"
+
+def _read_meta(meta_path: str) -> dict:
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+def _write_meta(meta_path: str, meta: dict):
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, meta_path)
+
+def _expired(meta: dict) -> bool:
+    return time.time() - meta["updatedAt"] > settings.UPLOAD_SESSION_TTL_HOURS * 3600
+
+def _remove_session(upload_id: str):
+    for path in _session_paths(upload_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _parse_metadata(header: str | None) -> dict:
+    """ Upload-Metadata: "filename <base64>,filetype <base64>" """
+    metadata = {}
+    for pair in (header or "").split(","):
+        parts = pair.strip().split(" ", 1)
+        if not parts[0]:
+            continue
+        try:
+            metadata[parts[0]] = base64.b64decode(parts[1]).decode() if len(parts) == 2 else ""
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid Upload-Metadata value for {parts[0]}")
+    return metadata
+
+def _offset_headers(meta: dict) -> dict:
+    return {
+        "Tus-Resumable": "1.0.0",
+        "Upload-Offset": str(meta["offset"]),
+        "Upload-Length": str(meta["length"]),
+        "Cache-Control": "no-store",
+    }
+
+def _load_session(upload_id: str) -> tuple[str, str, dict]:
+    part_path, meta_path = _session_paths(upload_id)
+    meta = _read_meta(meta_path)
+    if _expired(meta):
+        _remove_session(upload_id)
+        raise HTTPException(status_code=410, detail="Upload expired")
+    return part_path, meta_path, meta
+
+def _create_session(part_path: str, meta_path: str, meta: dict):
+    os.makedirs(INCOMING_DIR, exist_ok=True)
+    open(part_path, "wb").close()
+    _write_meta(meta_path, meta)
+
+def _open_locked(part_path: str):
+    """ The part file, exclusively locked: one writer per session, across workers as well. None once finalized """
+    try:
+        f = open(part_path, "r+b")
+    except FileNotFoundError:
+        return None
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise HTTPException(status_code=423, detail="Another chunk is being written")
+    return f
+
+def _rewind(f, offset: int):
+    # Drop bytes past the stored offset left by a write that was never recorded
+    f.truncate(offset)
+    f.seek(offset)
+
+def _sync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+def _finalize(part_path: str, meta_path: str, meta: dict, filename: str):
+    os.replace(part_path, os.path.join(UPLOAD_DIR, filename))
+    _write_meta(meta_path, meta)
+
+@router.post("/uploads", status_code=201)
+async def create_upload(
+    request: Request,
+    upload_length: int = Header(...),
+    upload_metadata: str | None = Header(None),
+):
+    if upload_length <= 0:
+        raise HTTPException(status_code=400, detail="Upload-Length must be positive")
+    if upload_length > settings.UPLOAD_MAX_SIZE_MB * 1024 * 1024:
+        raise HTTPException(status_code=413, detail=f"Upload is larger than {settings.UPLOAD_MAX_SIZE_MB} MB")
+
+    metadata = _parse_metadata(upload_metadata)
+    upload_id = uuid.uuid4().hex
+    part_path, meta_path = _session_paths(upload_id)
+    now = time.time()
+    meta = {
+        "length": upload_length,
+        "offset": 0,
+        "filename": metadata.get("filename", ""),
+        "createdAt": now,
+        "updatedAt": now,
+        "url": None,
+    }
+    await run_in_threadpool(_create_session, part_path, meta_path, meta)
+
+    location = f"{str(request.url).rstrip('/')}/{upload_id}"
+    return JSONResponse(
+        status_code=201,
+        content={"id": upload_id, "offset": 0},
+        headers={**_offset_headers(meta), "Location": location},
+    )
+
+@router.head("/uploads/{upload_id}")
+async def upload_offset(upload_id: str):
+    _, _, meta = await run_in_threadpool(_load_session, upload_id)
+    return Response(status_code=200, headers=_offset_headers(meta))
+
+def _check_offset(meta: dict, upload_offset: int):
+    if upload_offset != meta["offset"]:
+        raise HTTPException(status_code=409, detail=f"Upload-Offset must be {meta['offset']}", headers=_offset_headers(meta))
+
+def _done_response(meta: dict) -> JSONResponse:
+    return JSONResponse(content={"offset": meta["offset"], "url": meta["url"]}, headers=_offset_headers(meta))
+
+@router.patch("/uploads/{upload_id}")
+async def upload_chunk(request: Request, upload_id: str, upload_offset: int = Header(...)):
+    part_path, meta_path, meta = await run_in_threadpool(_load_session, upload_id)
+    # Cheap early rejection; checked again under the lock, where it counts
+    _check_offset(meta, upload_offset)
+    if meta["url"]:
+        # Retried final chunk: the file is already in place
+        return _done_response(meta)
+
+    f = await run_in_threadpool(_open_locked, part_path)
+    if f is None:
+        # Finalized by a concurrent request since the meta above was read
+        meta = await run_in_threadpool(_read_meta, meta_path)
+        _check_offset(meta, upload_offset)
+        return _done_response(meta)
+
+    with f:
+        # Another PATCH may have committed a chunk (or finished) between our first read and the lock
+        meta = await run_in_threadpool(_read_meta, meta_path)
+        _check_offset(meta, upload_offset)
+        if meta["url"]:
+            return _done_response(meta)
+
+        remaining = meta["length"] - meta["offset"]
+        chunk_limit = min(remaining, settings.UPLOAD_CHUNK_MAX_MB * 1024 * 1024)
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > chunk_limit:
+            raise HTTPException(status_code=413, detail=f"Chunk is larger than {chunk_limit} bytes")
+
+        await run_in_threadpool(_rewind, f, meta["offset"])
+        written = 0
+        pending = bytearray()
+        try:
+            async for chunk in request.stream():
+                if written + len(pending) + len(chunk) > chunk_limit:
+                    raise HTTPException(status_code=413, detail=f"Chunk is larger than {chunk_limit} bytes")
+                pending += chunk
+                if len(pending) >= WRITE_BUFFER_SIZE:
+                    await run_in_threadpool(f.write, pending)
+                    written += len(pending)
+                    pending = bytearray()
+        except ClientDisconnect:
+            # Keep what arrived; the client resumes from the offset HEAD reports
+            pass
+        finally:
+            if pending:
+                await run_in_threadpool(f.write, pending)
+                written += len(pending)
+            if written:
+                await run_in_threadpool(_sync, f)
+                meta["offset"] += written
+                meta["updatedAt"] = time.time()
+                await run_in_threadpool(_write_meta, meta_path, meta)
+
+        # Still under the lock, so only one request moves the file into place
+        if meta["offset"] == meta["length"]:
+            extension = os.path.splitext(meta["filename"])[1]
+            filename = f"{upload_id}{extension}"
+            base_url = str(request.base_url).rstrip('/')
+            meta["url"] = f"{base_url}/static/uploads/{filename}"
+            await run_in_threadpool(_finalize, part_path, meta_path, meta, filename)
+
+    return _done_response(meta)
+
+def cleanup_expired_uploads() -> int:
+    """ Remove sessions idle for longer than UPLOAD_SESSION_TTL_HOURS. Returns how many were removed """
+    if not os.path.isdir(INCOMING_DIR):
+        return 0
+    removed = 0
+    ttl = settings.UPLOAD_SESSION_TTL_HOURS * 3600
+    for name in os.listdir(INCOMING_DIR):
+        upload_id, extension = os.path.splitext(name)
+        path = os.path.join(INCOMING_DIR, name)
+        try:
+            if extension == ".json":
+                with open(path) as f:
+                    expired = _expired(json.load(f))
+            else:
+                # A .part or .tmp file whose sidecar is missing (crash during create)
+                expired = (
+                    not os.path.exists(os.path.join(INCOMING_DIR, upload_id + ".json"))
+                    and time.time() - os.path.getmtime(path) > ttl
+                )
+            if expired:
+                if extension == ".json":
+                    _remove_session(upload_id)
+                else:
+                    os.remove(path)
+                removed += 1
+        except (OSError, ValueError, KeyError, HTTPException) as e:
+            logger.error(f"Upload cleanup failed for {name}: {e}")
+    return removed
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey, JSON
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class PortfolioItem(Base):
+class PortfolioItem(VersionedMixin, Base):
     __tablename__ = "portfolio"
 
     id = Column(String, primary_key=True, index=True)
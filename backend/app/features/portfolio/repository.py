@@ -1,9 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.core.lean import fetch_json, table_columns
 from app.features.portfolio.models import *
 
 class PortfolioRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
-        
-    # Add generic CRUD methods here later depending on model
+
+    async def get_all_json(self) -> str:
+        """ Every row as a JSON array, serialized by PostgreSQL (lean read path) """
+        return await fetch_json(self.session, select(*table_columns(PortfolioItem)))
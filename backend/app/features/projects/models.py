@@ -1,13 +1,15 @@
 from sqlalchemy import Column, String, Float, Integer, ForeignKey, JSON
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class Project(Base):
+class Project(VersionedMixin, Base):
     __tablename__ = "projects"
 
     id = Column(String, primary_key=True, index=True)
     clientName = Column(JSON, nullable=False)
     address = Column(JSON)
     phone = Column(String)
+    phoneNormalized = Column(String, nullable=True, index=True) # E.164, see app.core.phone
     totalEstimate = Column(Float)
     startDate = Column(String)
     deadline = Column(String)
@@ -25,3 +27,10 @@ class Project(Base):
     payments = Column(JSON, nullable=True)
     timeline = Column(JSON, nullable=True)
     foremanSalary = Column(JSON, nullable=True) # { monthlyRate: number, records: [] }
+
+    # Derived from the blobs above on every write, see app.features.projects.service.apply_finance
+    paidToDate = Column(Float, nullable=True)
+    outstanding = Column(Float, nullable=True) # totalEstimate - paidToDate
+    foremanMonthlyCost = Column(Float, nullable=True) # foremanSalary.monthlyRate, USD
+    foremanCostTotal = Column(Float, nullable=True) # sum of foremanSalary.records, USD
+    margin = Column(Float, nullable=True) # totalEstimate - foremanCostTotal converted to UZS
@@ -1,9 +1,92 @@
+from datetime import date
+from typing import AsyncIterator, Optional
+from sqlalchemy import func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.core.tabular import EXPORT_BATCH_SIZE
 from app.features.projects.models import *
 
+# JSON arrays inside the blobs, empty when the blob is missing or malformed
+PAYMENTS = "json_array_elements(CASE WHEN json_typeof(p.payments) = 'array' THEN p.payments ELSE '[]'::json END)"
+SALARY_RECORDS = (
+    "json_array_elements(CASE WHEN json_typeof(p.\"foremanSalary\" -> 'records') = 'array' "
+    "THEN p.\"foremanSalary\" -> 'records' ELSE '[]'::json END)"
+)
+
 class ProjectsRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
-        
-    # Add generic CRUD methods here later depending on model
+
+    async def stream_for_export(
+        self, date_from: Optional[date], date_to: Optional[date], status: Optional[str]
+    ) -> AsyncIterator[Project]:
+        """ Iterate projects through a server-side cursor. startDate is stored as 'YYYY-MM-DD' text """
+        query = select(Project).order_by(Project.startDate)
+        if date_from:
+            query = query.where(Project.startDate >= date_from.isoformat())
+        if date_to:
+            query = query.where(Project.startDate <= date_to.isoformat())
+        if status:
+            query = query.where(Project.status == status)
+        result = await self.session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for project in result.scalars():
+            yield project
+
+    async def get_open_with_deadline(self) -> list[Project]:
+        """ Unfinished projects that have a deadline set """
+        result = await self.session.execute(
+            select(Project)
+            .where(Project.status.is_distinct_from("finished"), Project.deadline.isnot(None), Project.deadline != "")
+            .order_by(Project.deadline)
+        )
+        return result.scalars().all()
+
+    async def get_change_markers(self) -> dict[str, tuple[int, int]]:
+        """ id -> (version, number of payments), to tell what a write changed """
+        result = await self.session.execute(text(
+            f"SELECT p.id, p.version, (SELECT count(*) FROM {PAYMENTS}) AS payments FROM projects p"
+        ))
+        return {row.id: (row.version, row.payments) for row in result}
+
+    async def get_without_finance(self, limit: int) -> list[Project]:
+        """ Projects written before the derived finance columns existed """
+        result = await self.session.execute(select(Project).where(Project.paidToDate.is_(None)).limit(limit))
+        return result.scalars().all()
+
+    async def finance_by_status(self) -> list[dict]:
+        result = await self.session.execute(
+            select(
+                Project.status,
+                func.count().label("projects"),
+                func.coalesce(func.sum(Project.totalEstimate), 0).label("totalEstimate"),
+                func.coalesce(func.sum(Project.paidToDate), 0).label("paidToDate"),
+                func.coalesce(func.sum(Project.outstanding), 0).label("outstanding"),
+                func.coalesce(func.sum(Project.foremanMonthlyCost), 0).label("foremanMonthlyCost"),
+                func.coalesce(func.sum(Project.margin), 0).label("margin"),
+            ).group_by(Project.status).order_by(Project.status)
+        )
+        return [dict(row._mapping) for row in result]
+
+    async def payments_by_month(self) -> list[dict]:
+        """ Payments grouped by project status and 'YYYY-MM' of the payment date """
+        result = await self.session.execute(text(
+            "SELECT p.status, left(pay ->> 'date', 7) AS month, "
+            "count(*) AS payments, sum((pay ->> 'amount')::numeric) AS paid "
+            f"FROM projects p, LATERAL {PAYMENTS} AS pay "
+            "WHERE json_typeof(pay -> 'amount') = 'number' AND pay ->> 'date' IS NOT NULL "
+            "GROUP BY 1, 2 ORDER BY 2, 1"
+        ))
+        return [dict(row._mapping) for row in result]
+
+    async def foreman_cost_by_month(self) -> list[dict]:
+        """ Foreman salary records (USD) grouped by project status and 'YYYY-MM' of the record date """
+        result = await self.session.execute(text(
+            "SELECT p.status, left(rec ->> 'date', 7) AS month, "
+            "sum((rec ->> 'amount')::numeric) AS \"foremanCost\", "
+            # Legacy records hold "", "1", "yes"...: a ::boolean cast would abort the whole query
+            "sum(CASE WHEN lower(rec ->> 'isPaid') IN ('true', 't', '1', 'yes') THEN (rec ->> 'amount')::numeric ELSE 0 END) AS \"foremanPaid\" "
+            f"FROM projects p, LATERAL {SALARY_RECORDS} AS rec "
+            "WHERE json_typeof(rec -> 'amount') = 'number' AND rec ->> 'date' IS NOT NULL "
+            "GROUP BY 1, 2 ORDER BY 2, 1"
+        ))
+        return [dict(row._mapping) for row in result]
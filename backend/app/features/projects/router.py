@@ -1,31 +1,90 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
+from datetime import date
+from typing import Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
-from app.core.database import get_db
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_write_db
+from app.core.tabular import export_response
+from app.core.sync import changes_since, conditional_merge, get_for_update, sync_collection
 from app.features.projects.models import Project
+from app.features.projects.service import EXPORT_COLUMNS, ProjectsService, change_marker, export_rows, prepare_project
 
 router = APIRouter()
 
 @router.get("/")
-async def get_all_projects(db: AsyncSession = Depends(get_db)):
+async def get_all_projects(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Project))
     items = result.scalars().all()
     return items
 
+@router.get("/export")
+async def export_projects(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    format: Literal["csv", "xlsx"] = "csv",
+):
+    """
+    Stream projects as CSV or XLSX for accounting, nested JSON flattened into columns.
+    """
+    rows = export_rows(date_from, date_to, status)
+    return export_response(rows, EXPORT_COLUMNS, format, "projects")
+
+@router.get("/finance-summary")
+async def get_finance_summary(db: AsyncSession = Depends(get_read_db)):
+    """
+    Totals by status and payments / foreman cost by month, computed in SQL
+    from the per-project aggregates so the dashboard does not need the raw blobs.
+    """
+    return await ProjectsService(db).finance_summary()
+
+@router.get("/changes")
+async def get_projects_changes(
+    since: int = 0,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delta sync: rows changed and ids deleted since version `since`.
+    Pass the returned `version` as the next `since`.
+    Read from the primary: the admin panel calls it right after an /events
+    notification, before a replica may have replayed that commit.
+    """
+    return await changes_since(db, Project, "projects", since, limit)
+
 @router.post("/")
-async def create_or_update_projects(data: dict, db: AsyncSession = Depends(get_db)):
-    new_item = Project(**data)
-    await db.merge(new_item)
-    await db.commit()
-    return {"message": "Saved successfully"}
+async def create_or_update_projects(
+    data: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """
+    Upsert one project. `If-Match: "<version>"` makes it conditional, so two admins
+    editing the same project get a 412 instead of overwriting each other.
+    """
+    data = prepare_project(data)
+    # Locked until commit, so the marker and the If-Match check see the row that gets updated
+    existing = await get_for_update(db, Project, data.get("id"))
+    before = change_marker(existing) if existing is not None else None
+    item, changed = await conditional_merge(db, Project, data, if_match)
+    if changed:
+        await db.flush()
+        await ProjectsService(db).publish_change(item, before)
+        await db.commit()
+    response.headers["ETag"] = f'"{item.version}"'
+    return {"message": "Saved successfully", "version": item.version, "changed": changed}
 
 @router.post("/batch")
-async def create_batch_projects(data_list: list[dict], db: AsyncSession = Depends(get_db)):
+async def create_batch_projects(data_list: list[dict], db: AsyncSession = Depends(get_write_db)):
     try:
-        await db.execute(delete(Project))
-        for data in data_list:
-            item = Project(**data)
-            db.add(item)
+        items = [prepare_project(data) for data in data_list]
+        service = ProjectsService(db)
+        before = await service.repository.get_change_markers()
+        tombstones = await sync_collection(db, Project, "projects", items)
+        await db.flush()
+        await service.publish_batch_changes(before, items, tombstones)
         await db.commit()
         return {"message": "Projects synchronized"}
     except Exception as e:
@@ -1,6 +1,164 @@
+from datetime import date, timedelta
+from typing import AsyncIterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import i18n
+from app.core.config import settings
+from app.core.database import read_sessionmaker
+from app.core.events import publish_event
+from app.core.phone import normalize_phone
+from app.core.sync import clean_payload
+from app.core.tabular import localized, model_to_dict
+from app.features.bot.notifications import notify_admin
+from app.features.projects.models import Project
 from app.features.projects.repository import ProjectsRepository
 
+def _payments(row: dict) -> list:
+    return [p for p in row.get("payments") or [] if isinstance(p, dict)]
+
+def _salary_records(row: dict) -> list:
+    salary = row.get("foremanSalary") if isinstance(row.get("foremanSalary"), dict) else {}
+    return [r for r in salary.get("records") or [] if isinstance(r, dict)]
+
+EXPORT_COLUMNS = [
+    "id", "contractNumber", localized("clientName"), localized("address"), "phone", "telegramId",
+    "status", localized("currentStage"), "startDate", "deadline", "totalEstimate",
+    "finance.total", "finance.paid", "finance.remaining",
+    ("payments.count", lambda row: len(_payments(row))),
+    ("payments.total", lambda row: sum(p.get("amount") or 0 for p in _payments(row))),
+    ("payments.lastDate", lambda row: max((p.get("date") or "" for p in _payments(row)), default="")),
+    "foremanSalary.monthlyRate",
+    ("foremanSalary.paid", lambda row: sum(r.get("amount") or 0 for r in _salary_records(row) if r.get("isPaid"))),
+    ("foremanSalary.unpaid", lambda row: sum(r.get("amount") or 0 for r in _salary_records(row) if not r.get("isPaid"))),
+    "paidToDate", "outstanding", "margin",
+]
+
+# Written by apply_finance, never taken from the client
+FINANCE_FIELDS = ("paidToDate", "outstanding", "foremanMonthlyCost", "foremanCostTotal", "margin")
+BACKFILL_BATCH_SIZE = 500
+
+def _number(value) -> float:
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+def apply_finance(data: dict) -> dict:
+    """
+    Recompute the derived finance columns of one project from its payments and
+    foremanSalary blobs. Called on every project write, so the aggregates are
+    always in sync with the row without scanning other projects.
+    """
+    payments = _payments(data)
+    finance = data.get("finance") if isinstance(data.get("finance"), dict) else {}
+    salary = data.get("foremanSalary") if isinstance(data.get("foremanSalary"), dict) else {}
+
+    total = _number(data.get("totalEstimate")) or _number(finance.get("total"))
+    # Same precedence as the admin panel: payment history first, then the finance blob
+    paid = sum(_number(p.get("amount")) for p in payments) if payments else _number(finance.get("paid"))
+    foreman_cost = sum(_number(r.get("amount")) for r in _salary_records(data))
+
+    data["paidToDate"] = paid
+    data["outstanding"] = total - paid
+    data["foremanMonthlyCost"] = _number(salary.get("monthlyRate"))
+    data["foremanCostTotal"] = foreman_cost
+    data["margin"] = total - foreman_cost * settings.USD_TO_UZS_RATE
+    return data
+
+def change_marker(project: Project) -> tuple[int, int]:
+    """ (version, number of payments): compared after a write to pick the admin panel event """
+    return project.version, len(_payments({"payments": project.payments}))
+
+def prepare_project(data: dict) -> dict:
+    """ Incoming project payload -> column values: drop server-managed fields, derive the rest """
+    clean_payload(data)
+    data["phoneNormalized"] = normalize_phone(data.get("phone"))
+    return apply_finance(data)
+
 class ProjectsService:
     def __init__(self, session: AsyncSession):
         self.repository = ProjectsRepository(session)
+
+    async def finance_summary(self) -> dict:
+        """ Portfolio-wide finance dashboard, aggregated in SQL """
+        by_status = await self.repository.finance_by_status()
+        months: dict[tuple, dict] = {}
+        for row in await self.repository.payments_by_month():
+            months[(row["month"], row["status"])] = {**row, "foremanCost": 0, "foremanPaid": 0}
+        for row in await self.repository.foreman_cost_by_month():
+            entry = months.setdefault((row["month"], row["status"]), {"status": row["status"], "month": row["month"], "payments": 0, "paid": 0})
+            entry.update(foremanCost=row["foremanCost"], foremanPaid=row["foremanPaid"])
+        totals = {key: sum(row[key] for row in by_status) for key in ("projects", "totalEstimate", "paidToDate", "outstanding", "margin")}
+        return {
+            "totals": totals,
+            "byStatus": by_status,
+            # Projects without a status sit next to string statuses, None does not compare with str
+            "byMonth": [months[key] for key in sorted(months, key=lambda key: (key[0] or "", key[1] or ""))],
+        }
+
+    async def publish_change(self, project: Project, before: Optional[tuple[int, int]]):
+        """
+        Admin panel event for a flushed project write. `before` is the project's
+        (version, payment count) prior to the write, None for a new project.
+        """
+        version, payments = change_marker(project)
+        if before is not None and before[0] == version:
+            return
+        data = {"id": project.id, "status": project.status, "contractNumber": project.contractNumber}
+        if before is None:
+            event = "project.created"
+        elif payments > before[1]:
+            event = "project.payment_added"
+            data.update(payments=payments, paidToDate=project.paidToDate)
+        else:
+            event = "project.updated"
+        await publish_event(self.repository.session, event, version, data)
+
+    async def publish_batch_changes(self, before: dict[str, tuple[int, int]], items: list[dict], tombstones: list):
+        """ Events for a flushed /batch sync: one per created, changed or deleted project """
+        session = self.repository.session
+        for item in items:
+            # Already in the identity map after the merge, no query
+            project = await session.get(Project, item["id"]) if item.get("id") is not None else None
+            if project is not None:
+                await self.publish_change(project, before.get(project.id))
+        for tombstone in tombstones:
+            await publish_event(session, "project.deleted", tombstone.version, {"id": tombstone.entityId})
+
+    async def send_deadline_reminders(self, today: date):
+        """
+        Scheduled job: unfinished projects whose deadline (YYYY-MM-DD, from the admin
+        date input) is within PROJECT_DEADLINE_REMINDER_DAYS or already passed.
+        """
+        horizon = today + timedelta(days=settings.PROJECT_DEADLINE_REMINDER_DAYS)
+        due = []
+        for project in await self.repository.get_open_with_deadline():
+            try:
+                deadline = date.fromisoformat(project.deadline)
+            except ValueError:
+                continue
+            if deadline <= horizon:
+                due.append((deadline, project))
+        if not due:
+            return
+        lines = ["⏰ <b>Сроки проектов - Vicasa</b>\n"]
+        for deadline, project in due:
+            days = (deadline - today).days
+            when = f"просрочен на {-days} дн." if days < 0 else "сегодня" if days == 0 else f"через {days} дн."
+            name = i18n.project(project.clientName, "ru")
+            lines.append(f"• {name or project.id} ({project.contractNumber or '—'}): {deadline.strftime('%d.%m.%Y')}, {when}")
+        await notify_admin("\n".join(lines))
+
+    async def backfill_finance(self) -> int:
+        """ Fill the derived finance columns of rows written before they existed """
+        updated = 0
+        while projects := await self.repository.get_without_finance(BACKFILL_BATCH_SIZE):
+            for project in projects:
+                for key, value in apply_finance(model_to_dict(project)).items():
+                    if key in FINANCE_FIELDS:
+                        setattr(project, key, value)
+            await self.repository.session.commit()
+            updated += len(projects)
+        return updated
+
+async def export_rows(date_from: Optional[date], date_to: Optional[date], status: Optional[str]) -> AsyncIterator[dict]:
+    """ Own session: the response body is streamed after the request dependencies are closed """
+    async with read_sessionmaker()() as session:
+        async for project in ProjectsRepository(session).stream_for_export(date_from, date_to, status):
+            yield model_to_dict(project)
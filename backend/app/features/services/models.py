@@ -1,7 +1,8 @@
 from sqlalchemy import Column, String, JSON
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class ServiceCategory(Base):
+class ServiceCategory(VersionedMixin, Base):
     __tablename__ = "service_categories"
     id = Column(String, primary_key=True, index=True)
     title = Column(JSON)
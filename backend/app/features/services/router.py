@@ -1,32 +1,63 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
-from app.core.database import get_db
+from typing import Optional
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_write_db
+from app.core.i18n import Lang, project_json
+from app.core.lean import json_response
+from app.core.invalidation import commit_and_invalidate
+from app.core.sync import changes_since, clean_payload, conditional_merge, sync_collection
 from app.features.services.models import ServiceCategory
+from app.features.services.repository import ServicesRepository
 
 router = APIRouter()
 
+async def services_json(lang: Optional[str], db: AsyncSession) -> str:
+    """ Every item as a JSON array, cached serialized; also used by the bootstrap snapshot """
+    async def load():
+        return await ServicesRepository(db).get_all_json()
+    async def load_projected():
+        return project_json(await cached("services", "all", load), lang)
+    # Single-language payloads are cached separately per language
+    return await cached("services", ("all", lang), load_projected)
+
 @router.get("/")
-async def get_all_services(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(ServiceCategory))
-    items = result.scalars().all()
-    return items
+async def get_all_services(lang: Optional[Lang] = None, db: AsyncSession = Depends(get_db)):
+    # Cache fills read the primary: a replica may not have replayed the write that invalidated the cache yet
+    return json_response(await services_json(lang, db))
+
+@router.get("/changes")
+async def get_services_changes(
+    since: int = 0,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Delta sync: rows changed and ids deleted since version `since`.
+    Pass the returned `version` as the next `since`.
+    """
+    return await changes_since(db, ServiceCategory, "services", since, limit)
 
 @router.post("/")
-async def create_or_update_services(data: dict, db: AsyncSession = Depends(get_db)):
-    new_item = ServiceCategory(**data)
-    await db.merge(new_item)
-    await db.commit()
-    return {"message": "Saved successfully"}
+async def create_or_update_services(
+    data: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """ Upsert one item. `If-Match: "<version>"` makes it conditional (412 on conflict) """
+    item, changed = await conditional_merge(db, ServiceCategory, clean_payload(data), if_match)
+    if changed:
+        await commit_and_invalidate(db, "services")
+    response.headers["ETag"] = f'"{item.version}"'
+    return {"message": "Saved successfully", "version": item.version, "changed": changed}
 
 @router.post("/batch")
-async def create_batch_services(data_list: list[dict], db: AsyncSession = Depends(get_db)):
+async def create_batch_services(data_list: list[dict], db: AsyncSession = Depends(get_write_db)):
     try:
-        await db.execute(delete(ServiceCategory))
-        for data in data_list:
-            item = ServiceCategory(**data)
-            db.add(item)
-        await db.commit()
+        await sync_collection(db, ServiceCategory, "services", data_list)
+        await commit_and_invalidate(db, "services")
         return {"message": "Services synchronized"}
     except Exception as e:
         await db.rollback()
@@ -1,7 +1,8 @@
 from sqlalchemy import Column, Integer, JSON
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class CalculatorSetting(Base):
+class CalculatorSetting(VersionedMixin, Base):
     """ Singleton or multi-row table to store prices like `new: {economy, standard, premium}` """
     __tablename__ = "calculator_settings"
     id = Column(Integer, primary_key=True, index=True)
@@ -1,30 +1,46 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.database import get_db
+from typing import Optional
+from app.core.cache import cached
+from app.core.database import get_db, get_write_db
+from app.core.invalidation import commit_and_invalidate
+from app.core.lean import fetch_json, json_response, table_columns
+from app.core.sync import clean_payload, conditional_merge
 from app.features.settings.models import CalculatorSetting
 
 router = APIRouter()
 
+async def settings_json(db: AsyncSession) -> str:
+    """ Every settings row as a JSON array, cached serialized; also used by the bootstrap snapshot """
+    async def load():
+        return await fetch_json(db, select(*table_columns(CalculatorSetting)))
+    return await cached("settings", "all", load)
+
 @router.get("/")
 async def get_all_settings(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(CalculatorSetting))
-    items = result.scalars().all()
-    # Pydantic is cleaner but returning dict simplifies our quick setup
-    return items
+    # Cache fills read the primary: a replica may not have replayed the write that invalidated the cache yet
+    return json_response(await settings_json(db))
 
 @router.post("/")
-async def create_or_update_settings(data: dict, db: AsyncSession = Depends(get_db)):
-    new_item = CalculatorSetting(**data)
-    await db.merge(new_item)
-    await db.commit()
-    return {"message": "Saved successfully"}
+async def create_or_update_settings(
+    data: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """ Upsert one item. `If-Match: "<version>"` makes it conditional (412 on conflict) """
+    item, changed = await conditional_merge(db, CalculatorSetting, clean_payload(data), if_match)
+    if changed:
+        await commit_and_invalidate(db, "settings")
+    response.headers["ETag"] = f'"{item.version}"'
+    return {"message": "Saved successfully", "version": item.version, "changed": changed}
 
 @router.post("/batch")
-async def create_batch_settings(data_list: list[dict], db: AsyncSession = Depends(get_db)):
+async def create_batch_settings(data_list: list[dict], db: AsyncSession = Depends(get_write_db)):
     for data in data_list:
-        item = CalculatorSetting(**data)
+        item = CalculatorSetting(**clean_payload(data))
         await db.merge(item)
-    await db.commit()
+    await commit_and_invalidate(db, "settings")
     return {"message": "Batch upserted"}
 
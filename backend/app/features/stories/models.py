@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, JSON, DateTime
+from sqlalchemy import Column, String, JSON, DateTime, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
+from app.core.sync import VersionedMixin
 
-class Story(Base):
+class Story(VersionedMixin, Base):
     __tablename__ = "stories"
     id = Column(String, primary_key=True, index=True)
     category = Column(String) # 'process' | 'reviews' | 'team' | 'promo'
@@ -11,3 +12,15 @@ class Story(Base):
     videoUrl = Column(String, nullable=True)
     linkUrl = Column(String, nullable=True)
     createdAt = Column(DateTime(timezone=True), server_default=func.now())
+    expiresAt = Column(DateTime(timezone=True), nullable=True) # explicit expiry, overrides STORY_TTL_HOURS
+    archivedAt = Column(DateTime(timezone=True), nullable=True) # set by the background archiver
+
+    __table_args__ = (
+        # Backs the feed query: WHERE archivedAt IS NULL AND category = ? ORDER BY createdAt DESC
+        Index(
+            "ix_stories_category_created_at",
+            "category",
+            createdAt.desc(),
+            postgresql_where=archivedAt.is_(None),
+        ),
+    )
@@ -1,9 +1,45 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, or_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.core.lean import fetch_json, table_columns
 from app.features.stories.models import *
 
+def active_clause(now: datetime, ttl: Optional[timedelta]):
+    """ SQL condition for stories that are neither archived nor expired at `now` """
+    if ttl:
+        not_expired = or_(
+            Story.expiresAt > now,
+            and_(Story.expiresAt.is_(None), Story.createdAt > now - ttl),
+        )
+    else:
+        not_expired = or_(Story.expiresAt.is_(None), Story.expiresAt > now)
+    return and_(Story.archivedAt.is_(None), not_expired)
+
 class StoriesRepository:
     def __init__(self, session: AsyncSession):
         self.session = session
-        
-    # Add generic CRUD methods here later depending on model
+
+    async def get_all(self) -> str:
+        """ Every story, including expired and archived ones, as a JSON array serialized by PostgreSQL """
+        return await fetch_json(self.session, select(*table_columns(Story)), "-createdAt")
+
+    async def get_active(
+        self, now: datetime, ttl: Optional[timedelta], category: Optional[str], limit: int
+    ) -> str:
+        """ Active stories, newest first, as a JSON array serialized by PostgreSQL. Uses ix_stories_category_created_at """
+        query = select(*table_columns(Story)).where(active_clause(now, ttl))
+        if category:
+            query = query.where(Story.category == category)
+        query = query.order_by(Story.createdAt.desc()).limit(limit)
+        return await fetch_json(self.session, query, "-createdAt")
+
+    async def archive_expired(self, now: datetime, ttl: Optional[timedelta]) -> int:
+        """ Mark expired, not yet archived stories as archived. Returns the number of rows touched, not committed """
+        result = await self.session.execute(
+            update(Story)
+            .where(Story.archivedAt.is_(None), ~active_clause(now, ttl))
+            .values(archivedAt=now)
+        )
+        return result.rowcount
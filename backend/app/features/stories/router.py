@@ -1,53 +1,100 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
-from datetime import datetime
-from app.core.database import get_db
+from datetime import datetime, timezone
+from typing import Optional
+from app.core.cache import cached
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, get_write_db
+from app.core.i18n import Lang, project_json
+from app.core.lean import json_response
+from app.core.invalidation import commit_and_invalidate
+from app.core.sync import changes_since, clean_payload, conditional_merge, sync_collection
 from app.features.stories.models import Story
+from app.features.stories.service import StoriesService
 
 router = APIRouter()
 
+DATETIME_KEYS = ('createdAt', 'expiresAt', 'archivedAt')
+
+# Cache fills read the primary: a replica may not have replayed the write that invalidated the cache yet
+def get_stories_service(db: AsyncSession = Depends(get_db)) -> StoriesService:
+    return StoriesService(db)
+
+def parse_datetimes(data: dict) -> dict:
+    """ Convert ISO strings coming from the client into datetimes """
+    for key in DATETIME_KEYS:
+        if key in data and isinstance(data[key], str):
+            try:
+                # Aware UTC like the stored values: a naive datetime never compares equal,
+                # so every batch would rewrite (and re-version) every story
+                parsed = datetime.fromisoformat(data[key].replace('Z', '+00:00'))
+                data[key] = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+            except Exception:
+                # If parsing fails, delete the key so DB uses its default
+                del data[key]
+    return data
+
+async def stories_json(
+    category: Optional[str], limit: Optional[int], include_expired: bool, lang: Optional[str], service: StoriesService
+) -> str:
+    """ The stories as a JSON array, cached serialized; also used by the bootstrap snapshot """
+    async def load():
+        return project_json(await service.list_stories(category, limit, include_expired), lang)
+    return await cached("stories", (category, limit, include_expired, lang), load)
+
 @router.get("/")
-async def get_all_stories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Story))
-    items = result.scalars().all()
-    return items
+async def get_all_stories(
+    category: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    include_expired: bool = False,
+    lang: Optional[Lang] = None,
+    service: StoriesService = Depends(get_stories_service)
+):
+    """
+    Active stories, newest first. Pass `include_expired=true` to get the full history
+    and `lang` to get titles in a single language.
+    """
+    return json_response(await stories_json(category, limit, include_expired, lang, service))
+
+@router.get("/changes")
+async def get_stories_changes(
+    since: int = 0,
+    limit: int = Query(settings.SYNC_PAGE_SIZE, ge=1, le=settings.SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Delta sync: rows changed and ids deleted since version `since`.
+    Archived stories come back as changes with `archivedAt` set.
+    """
+    return await changes_since(db, Story, "stories", since, limit)
 
 @router.post("/")
-async def create_or_update_stories(data: dict, db: AsyncSession = Depends(get_db)):
-    new_item = Story(**data)
-    await db.merge(new_item)
-    await db.commit()
-    return {"message": "Saved successfully"}
+async def create_or_update_stories(
+    data: dict,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_write_db)
+):
+    """ Upsert one item. `If-Match: "<version>"` makes it conditional (412 on conflict) """
+    item, changed = await conditional_merge(db, Story, parse_datetimes(clean_payload(data)), if_match)
+    if changed:
+        await commit_and_invalidate(db, "stories")
+    response.headers["ETag"] = f'"{item.version}"'
+    return {"message": "Saved successfully", "version": item.version, "changed": changed}
 
 @router.post("/batch")
-async def create_batch_stories(data_list: list[dict], db: AsyncSession = Depends(get_db)):
+async def create_batch_stories(data_list: list[dict], db: AsyncSession = Depends(get_write_db)):
     try:
-        # 1. Clear current state (Batch sync means the client list is the source of truth)
-        await db.execute(delete(Story))
-        
-        # 2. Add all items from the new list
-        for data in data_list:
-            # Filter dict to only include model keys to avoid unexpected fields
-            # Story model has id, category, imageUrl, title, videoUrl
-            allowed_keys = ['id', 'category', 'imageUrl', 'title', 'videoUrl', 'linkUrl', 'createdAt']
-            filtered_data = {k: v for k, v in data.items() if k in allowed_keys}
-            
-            if 'createdAt' in filtered_data and isinstance(filtered_data['createdAt'], str):
-                try:
-                    # Remove 'Z' and parse ISO format
-                    dt_str = filtered_data['createdAt'].replace('Z', '')
-                    filtered_data['createdAt'] = datetime.fromisoformat(dt_str)
-                except Exception:
-                    # If parsing fails, delete the key so DB uses its default
-                    del filtered_data['createdAt']
-            
-            item = Story(**filtered_data)
-            db.add(item)
-            
-        await db.commit()
+        # Filter dicts to only include model keys to avoid unexpected fields
+        allowed_keys = ['id', 'category', 'imageUrl', 'title', 'videoUrl', 'linkUrl', 'createdAt', 'expiresAt']
+        items = [parse_datetimes({k: v for k, v in data.items() if k in allowed_keys}) for data in data_list]
+
+        # Batch sync means the client list is the source of truth, so it must be the full
+        # `include_expired=true` list, never the capped public feed.
+        # Archived stories are kept as history, the client never sends them
+        await sync_collection(db, Story, "stories", items, scope=Story.archivedAt.is_(None))
+        await commit_and_invalidate(db, "stories")
         return {"message": "Stories synchronized"}
     except Exception as e:
         await db.rollback()
         raise e
-
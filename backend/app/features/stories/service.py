@@ -1,6 +1,32 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.invalidation import commit_and_invalidate
 from app.features.stories.repository import StoriesRepository
 
+def story_ttl() -> Optional[timedelta]:
+    return timedelta(hours=settings.STORY_TTL_HOURS) if settings.STORY_TTL_HOURS > 0 else None
+
 class StoriesService:
     def __init__(self, session: AsyncSession):
         self.repository = StoriesRepository(session)
+
+    async def list_stories(
+        self, category: Optional[str] = None, limit: Optional[int] = None, include_expired: bool = False
+    ) -> str:
+        """
+        Active stories ordered by createdAt desc, as a JSON array.
+        `include_expired` returns the full history (admin panel).
+        """
+        if include_expired:
+            return await self.repository.get_all()
+        limit = min(limit or settings.STORY_FEED_LIMIT, settings.STORY_FEED_LIMIT)
+        now = datetime.now(timezone.utc)
+        return await self.repository.get_active(now, story_ttl(), category, limit)
+
+    async def archive_expired(self) -> int:
+        archived = await self.repository.archive_expired(datetime.now(timezone.utc), story_ttl())
+        if archived:
+            await commit_and_invalidate(self.repository.session, "stories")
+        return archived
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy.sql import func
 from app.core.database import Base
 
 class User(Base):
@@ -10,7 +11,10 @@ class User(Base):
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
     phone = Column(String, nullable=True)
+    phone_normalized = Column(String, nullable=True, index=True) # E.164, see app.core.phone
     language = Column(String, default="ru")
     photo_url = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
+    # Unknown for users registered before the column existed
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), info={"backfill": None})
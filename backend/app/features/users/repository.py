@@ -3,7 +3,16 @@ from sqlalchemy.future import select
 from app.features.users.models import User
 from app.features.users.schemas import UserCreate
 from app.core.config import settings
-from typing import Optional
+from app.core.phone import normalize_phone
+from datetime import date, timedelta
+from typing import AsyncIterator, Optional
+from app.core.tabular import EXPORT_BATCH_SIZE
+
+# Columns of UserResponse, read without loading the whole row into an ORM instance
+PROFILE_COLUMNS = (
+    User.id, User.telegram_id, User.username, User.first_name, User.last_name,
+    User.phone, User.photo_url, User.is_active, User.is_admin,
+)
 
 class UserRepository:
     def __init__(self, session: AsyncSession):
@@ -14,6 +23,12 @@ class UserRepository:
         result = await self.session.execute(select(User).where(User.telegram_id == telegram_id))
         return result.scalars().first()
 
+    async def get_profile(self, telegram_id: str) -> Optional[dict]:
+        """ Public profile fields of a user, lean read path (no ORM instance) """
+        result = await self.session.execute(select(*PROFILE_COLUMNS).where(User.telegram_id == telegram_id))
+        row = result.mappings().first()
+        return dict(row) if row else None
+
     async def get_all(self) -> list[User]:
         """ Fetch all users from db """
         result = await self.session.execute(select(User))
@@ -27,6 +42,7 @@ class UserRepository:
             first_name=user_in.first_name,
             last_name=user_in.last_name,
             phone=user_in.phone,
+            phone_normalized=normalize_phone(user_in.phone),
             photo_url=user_in.photo_url,
             is_admin=user_in.telegram_id in settings.ADMIN_TELEGRAM_IDS
         )
@@ -34,3 +50,18 @@ class UserRepository:
         await self.session.commit()
         await self.session.refresh(db_user)
         return db_user
+
+    async def stream_for_export(
+        self, date_from: Optional[date], date_to: Optional[date], is_active: Optional[bool]
+    ) -> AsyncIterator[User]:
+        """ Iterate users through a server-side cursor """
+        query = select(User).order_by(User.id)
+        if date_from:
+            query = query.where(User.created_at >= date_from)
+        if date_to:
+            query = query.where(User.created_at < date_to + timedelta(days=1))
+        if is_active is not None:
+            query = query.where(User.is_active == is_active)
+        result = await self.session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for user in result.scalars():
+            yield user
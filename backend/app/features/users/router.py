@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.database import get_db
+from app.core.database import get_read_db, get_write_db
+from app.core.tabular import export_response
 from app.features.users.schemas import UserCreate, UserResponse
-from app.features.users.service import UserService
+from app.features.users.service import UserService, EXPORT_COLUMNS, export_rows
 
-from typing import List
+from datetime import date
+from typing import List, Literal, Optional
 
 router = APIRouter()
 
-def get_user_service(db: AsyncSession = Depends(get_db)) -> UserService:
+def get_user_service(db: AsyncSession = Depends(get_read_db)) -> UserService:
+    return UserService(db)
+
+def get_user_write_service(db: AsyncSession = Depends(get_write_db)) -> UserService:
     return UserService(db)
 
 @router.get("/", response_model=List[UserResponse])
@@ -23,7 +28,7 @@ async def get_users(
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_in: UserCreate,
-    service: UserService = Depends(get_user_service)
+    service: UserService = Depends(get_user_write_service)
 ):
     """
     Endpoint for registering a new user via Telegram Web App.
@@ -31,6 +36,19 @@ async def register_user(
     user = await service.register_telegram_user(user_in)
     return user
 
+@router.get("/export")
+async def export_users(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    is_active: Optional[bool] = None,
+    format: Literal["csv", "xlsx"] = "csv",
+):
+    """
+    Stream registered users as CSV or XLSX.
+    """
+    rows = export_rows(date_from, date_to, is_active)
+    return export_response(rows, EXPORT_COLUMNS, format, "users")
+
 @router.get("/{telegram_id}", response_model=UserResponse)
 async def get_user(
     telegram_id: str,
@@ -39,7 +57,7 @@ async def get_user(
     """
     Get existing Telegram user by ID.
     """
-    user = await service.get_user_by_telegram_id(telegram_id)
+    user = await service.get_profile(telegram_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
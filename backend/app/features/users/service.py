@@ -1,9 +1,17 @@
-from typing import Optional
+from datetime import date
+from typing import AsyncIterator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.features.users.repository import UserRepository
 from app.features.users.schemas import UserCreate
 from app.features.users.models import User
 from app.core.config import settings
+from app.core.database import read_sessionmaker
+from app.core.tabular import model_to_dict
+
+EXPORT_COLUMNS = [
+    "id", "telegram_id", "username", "first_name", "last_name", "phone",
+    "language", "is_active", "is_admin", "created_at",
+]
 
 class UserService:
     def __init__(self, session: AsyncSession):
@@ -56,3 +64,15 @@ class UserService:
         Retrieve a user. Further logic can be placed here if necessary.
         """
         return await self.repository.get_by_telegram_id(telegram_id)
+
+    async def get_profile(self, telegram_id: str) -> Optional[dict]:
+        """
+        Retrieve the fields returned by GET /users/{telegram_id}.
+        """
+        return await self.repository.get_profile(telegram_id)
+
+async def export_rows(date_from: Optional[date], date_to: Optional[date], is_active: Optional[bool]) -> AsyncIterator[dict]:
+    """ Own session: the response body is streamed after the request dependencies are closed """
+    async with read_sessionmaker()() as session:
+        async for user in UserRepository(session).stream_for_export(date_from, date_to, is_active):
+            yield model_to_dict(user)
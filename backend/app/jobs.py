@@ -0,0 +1,46 @@
+import logging
+from datetime import datetime
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.i18n import LANGUAGES
+from app.core.scheduler import scheduler
+from app.features.bootstrap.service import bootstrap_snapshots
+from app.features.leads.service import LeadsService
+from app.features.media_router import cleanup_expired_uploads
+from app.features.projects.service import ProjectsService
+from app.features.stories.service import StoriesService
+
+# Periodic work, run by app.core.scheduler. Exclusive jobs run once across all
+# workers (on the advisory lock holder); exclusive=False jobs run in every worker.
+
+logger = logging.getLogger(__name__)
+
+@scheduler.job("archive-expired-stories", settings.SCHEDULE_STORY_ARCHIVE, timeout=120)
+async def archive_expired_stories():
+    async with AsyncSessionLocal() as session:
+        archived = await StoriesService(session).archive_expired()
+    if archived:
+        logger.info(f"Archived {archived} expired stories")
+
+@scheduler.job("upload-cleanup", settings.SCHEDULE_UPLOAD_CLEANUP, timeout=600)
+async def upload_cleanup():
+    removed = await run_in_threadpool(cleanup_expired_uploads)
+    if removed:
+        logger.info(f"Removed {removed} expired upload sessions")
+
+@scheduler.job("lead-digest", settings.SCHEDULE_LEAD_DIGEST, timeout=120)
+async def lead_digest():
+    async with AsyncSessionLocal() as session:
+        await LeadsService(session).send_daily_digest()
+
+@scheduler.job("deadline-reminders", settings.SCHEDULE_DEADLINE_REMINDERS, timeout=120)
+async def deadline_reminders():
+    async with AsyncSessionLocal() as session:
+        await ProjectsService(session).send_deadline_reminders(datetime.now(scheduler.tz).date())
+
+@scheduler.job("cache-prewarm", settings.SCHEDULE_CACHE_PREWARM, timeout=60, jitter=30, exclusive=False)
+async def prewarm_caches():
+    # The caches are per process, so every worker warms its own
+    for lang in (None, *LANGUAGES):
+        await bootstrap_snapshots.get(lang)
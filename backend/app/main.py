@@ -1,9 +1,14 @@
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.backfills import run_once
+from app.core.database import engine, read_engine, Base, PRIMARY_PIN_HEADER, sync_schema
+from app.core.invalidation import invalidation_listener
+from app.core.lifecycle import background_tasks, state
+from app.core.scheduler import scheduler
 
 import app.features.users.models
 import app.features.leads.models
@@ -13,6 +18,7 @@ import app.features.catalog.models
 import app.features.services.models
 import app.features.stories.models
 import app.features.settings.models
+import app.features.bot.models
 
 from app.features.users.router import router as users_router
 from app.features.leads.router import router as leads_router
@@ -23,16 +29,31 @@ from app.features.services.router import router as services_router
 from app.features.stories.router import router as stories_router
 from app.features.settings.router import router as settings_router
 from app.features.media_router import router as media_router
-from app.features.bot.bot import start_bot
+from app.features.bot.router import router as broadcasts_router
+from app.features.clients.router import router as clients_router
+from app.features.bootstrap.router import router as bootstrap_router
+from app.features.health_router import router as health_router
+from app.features.events_router import router as events_router
+from app.features.bot import notifications
+from app.features.bot.client import close_bot
+from app.features.bot.broadcast import resume_broadcasts_loop
+from app.features.projects.service import ProjectsService
+from app.features.clients.service import ClientsService
+from app.features.leads.booking import backfill_booking_times
 from app.seed import seed_data
+import app.jobs
 from fastapi.staticfiles import StaticFiles
 import os
 import asyncio
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(sync_schema)
     
     # Run seeding
     try:
@@ -40,12 +61,56 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"Error during seeding: {e}")
 
+    # Derived project finance columns for rows written before they existed
+    try:
+        await run_once("project_finance", lambda session: ProjectsService(session).backfill_finance())
+    except Exception:
+        logger.exception("Project finance backfill failed")
+
+    # Normalized phones for rows written before the client index existed
+    try:
+        await run_once("phone_numbers", lambda session: ClientsService(session).backfill_phone_numbers())
+    except Exception:
+        logger.exception("Phone backfill failed")
+
+    # Typed booking times for leads written before bookingAt existed
+    try:
+        await run_once("booking_times", backfill_booking_times)
+    except Exception:
+        logger.exception("Booking time backfill failed")
+
     # Ensure static directory exists
     os.makedirs("static/uploads", exist_ok=True)
-    # Start bot in background
-    asyncio.create_task(start_bot())
+    # Start bot in background. aiogram is only imported by processes that poll
+    if settings.BOT_POLLING_ENABLED:
+        from app.features.bot.bot import start_bot
+        background_tasks.spawn("bot", start_bot())
+    # Send admin notifications off the request path
+    background_tasks.spawn("notifications", notifications.notifications_worker())
+    # Keep this worker's cache coherent with writes made by other workers; also feeds the admin event streams
+    background_tasks.spawn("cache-listener", invalidation_listener.run())
+    # Periodic jobs (app.jobs): story archiving, upload cleanup, digests, cache pre-warming
+    background_tasks.spawn("scheduler", scheduler.run())
+    # Start pending broadcasts and resume interrupted ones
+    background_tasks.spawn("broadcasts", resume_broadcasts_loop())
     yield
 
+    # Shutdown, in order: stop being ready, stop taking bot updates, stop background work,
+    # flush admin notifications, then close the Telegram session and the database pools
+    timeout = settings.SHUTDOWN_TIMEOUT_SECONDS
+    state["draining"] = True
+    if background_tasks.get("bot") is not None:
+        from app.features.bot.bot import stop_bot
+        await stop_bot(background_tasks.get("bot"))
+    await background_tasks.cancel_all(timeout, exclude=("bot", "notifications"))
+    if not await notifications.drain(timeout):
+        print(f"Shutdown: {notifications.backlog()} admin notifications not sent")
+    await background_tasks.cancel_all(timeout)
+    await close_bot()
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Mount static files
@@ -63,8 +128,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by the admin panel's resumable uploader, and the read-your-writes pin
+    expose_headers=["Upload-Offset", "Upload-Length", "Location", PRIMARY_PIN_HEADER],
 )
 
+app.include_router(health_router, tags=["health"])
 app.include_router(users_router, prefix="/api/v1/users", tags=["users"])
 app.include_router(leads_router, prefix="/api/v1/leads", tags=["leads"])
 app.include_router(projects_router, prefix="/api/v1/projects", tags=["projects"])
@@ -74,6 +142,10 @@ app.include_router(services_router, prefix="/api/v1/services", tags=["services"]
 app.include_router(stories_router, prefix="/api/v1/stories", tags=["stories"])
 app.include_router(settings_router, prefix="/api/v1/settings", tags=["settings"])
 app.include_router(media_router, prefix="/api/v1/media", tags=["media"])
+app.include_router(broadcasts_router, prefix="/api/v1/broadcasts", tags=["broadcasts"])
+app.include_router(clients_router, prefix="/api/v1/clients", tags=["clients"])
+app.include_router(bootstrap_router, prefix="/api/v1/bootstrap", tags=["bootstrap"])
+app.include_router(events_router, prefix="/api/v1/events", tags=["events"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,87 @@
+"""
+Cold-start import cost of the API process.
+
+Imports `app.main` in a fresh interpreter with `-X importtime` (no database or network
+needed, the lifespan does not run) and reports the total import time, the slowest
+top-level packages and whether modules that should load lazily were imported.
+Exits non-zero when the budget is exceeded or a lazy module was loaded, so it can
+run in CI:
+
+    cd backend
+    python -m benchmarks.cold_start --runs 5 --budget-ms 1500
+
+The budget defaults to DEFAULT_BUDGET_MS; profiling without it takes an explicit --no-budget.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Optional
+
+# Median import time of app.main above which the run fails
+DEFAULT_BUDGET_MS = 1500
+
+# Only loaded when actually used: the bot (polling processes, first notification) and XLSX export
+LAZY_MODULES = ("aiogram", "openpyxl")
+
+def import_profile(target: str) -> dict[str, int]:
+    """ Cumulative import time in microseconds per module, from one fresh interpreter """
+    env = {**os.environ}
+    env.setdefault("TELEGRAM_BOT_TOKEN", "42:BENCHMARK")
+    env.setdefault("WEB_APP_URL", "https://localhost")
+    env.setdefault("DATABASE_ECHO", "false")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {target} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+def main(target: str, runs: int, budget_ms: Optional[float], top: int) -> int:
+    totals = []
+    by_package: dict[str, list[int]] = defaultdict(list)
+    for _ in range(runs):
+        modules = import_profile(target)
+        totals.append(modules.get(target, 0) / 1000)
+        for name, cumulative in modules.items():
+            # Top-level entries only: their cumulative time includes everything they import
+            if "." not in name:
+                by_package[name].append(cumulative)
+
+    total_ms = statistics.median(totals)
+    print(f"import {target}: median {total_ms:.1f} ms over {runs} runs (min {min(totals):.1f}, max {max(totals):.1f})")
+    print(f"\n{'package':<32}{'ms':>10}")
+    slowest = sorted(by_package.items(), key=lambda item: -statistics.median(item[1]))[:top]
+    for name, samples in slowest:
+        print(f"{name:<32}{statistics.median(samples) / 1000:>10.1f}")
+
+    failed = False
+    loaded = [name for name in LAZY_MODULES if name in by_package]
+    if loaded:
+        print(f"\nFAIL: imported at startup but should load lazily: {', '.join(loaded)}")
+        failed = True
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"\nFAIL: {total_ms:.1f} ms exceeds the {budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API process cold-start import benchmark")
+    parser.add_argument("--target", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Fail above this median import time")
+    parser.add_argument("--no-budget", action="store_true", help="Report only, never fail on import time")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    sys.exit(main(args.target, args.runs, None if args.no_budget else args.budget_ms, args.top))
@@ -0,0 +1,139 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+import pytest
+from fastapi import HTTPException
+from app.features.leads import booking
+from app.features.leads.booking import apply_booking_time, availability, day_slots, parse_booking_time, reserve_slot
+from app.features.leads.repository import LeadsRepository
+
+TZ = ZoneInfo("Asia/Tashkent")
+
+def next_weekday(weekday: int) -> date:
+    """ A future day with the given weekday, far enough ahead that all its slots are open """
+    day = date.today() + timedelta(days=7)
+    return day + timedelta(days=(weekday - day.weekday()) % 7)
+
+MONDAY = next_weekday(0)
+SUNDAY = next_weekday(6)
+
+def at(day: date, clock: str) -> datetime:
+    hour, minute = map(int, clock.split(":"))
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=TZ)
+
+class FakeSession:
+    """ Records the statements reserve_slot executes (the advisory lock) """
+    def __init__(self):
+        self.executed = []
+
+    async def execute(self, statement, params=None):
+        self.executed.append((str(statement), params))
+
+@pytest.fixture
+def bookings(monkeypatch):
+    """ Stored bookings by slot start, as LeadsRepository.count_bookings returns them """
+    counts: dict[datetime, int] = {}
+
+    async def count_bookings(self, start, end, exclude_id=None):
+        return {slot: count for slot, count in counts.items() if start <= slot < end}
+
+    monkeypatch.setattr(LeadsRepository, "count_bookings", count_bookings)
+    return counts
+
+def test_day_slots():
+    assert day_slots(MONDAY) == [at(MONDAY, "09:00"), at(MONDAY, "11:00"), at(MONDAY, "14:00"), at(MONDAY, "16:00")]
+
+def test_no_slots_on_days_off():
+    assert day_slots(SUNDAY) == []
+
+@pytest.mark.parametrize("date_value, time_value", [
+    ("03.11.2026", "14:00"),
+    ("2026-11-03", "14:00:00"),
+    ("03/11/2026", "14.00"),
+    ("03.11.26", "14:00"),
+])
+def test_parse_booking_time(date_value, time_value):
+    assert parse_booking_time(date_value, time_value) == datetime(2026, 11, 3, 14, 0, tzinfo=TZ)
+
+@pytest.mark.parametrize("date_value, time_value", [(None, "14:00"), ("03.11.2026", None), ("завтра", "14:00"), ("03.11.2026", "днём")])
+def test_parse_booking_time_unparseable(date_value, time_value):
+    assert parse_booking_time(date_value, time_value) is None
+
+def test_apply_booking_time_from_iso():
+    data = apply_booking_time({"bookingAt": "2026-11-03T09:00:00Z"})
+    assert data["bookingAt"] == datetime(2026, 11, 3, 9, 0, tzinfo=timezone.utc)
+
+def test_apply_booking_time_naive_iso_is_local():
+    data = apply_booking_time({"bookingAt": "2026-11-03T14:00:00"})
+    assert data["bookingAt"] == datetime(2026, 11, 3, 14, 0, tzinfo=TZ)
+
+def test_apply_booking_time_from_booking_data():
+    data = apply_booking_time({"bookingData": {"date": "03.11.2026", "time": "14:00"}})
+    assert data["bookingAt"] == datetime(2026, 11, 3, 14, 0, tzinfo=TZ)
+
+def test_apply_booking_time_rejects_invalid_iso():
+    with pytest.raises(HTTPException) as error:
+        apply_booking_time({"bookingAt": "tomorrow"})
+    assert error.value.status_code == 422
+
+def test_apply_booking_time_keeps_partial_update():
+    assert apply_booking_time({"status": "done"}) == {"status": "done"}
+
+def test_availability(bookings):
+    bookings[at(MONDAY, "09:00")] = 2
+    bookings[at(MONDAY, "14:00")] = 1
+    days = asyncio.run(availability(FakeSession(), MONDAY, MONDAY + timedelta(days=6)))
+
+    assert [day["date"] for day in days] == [(MONDAY + timedelta(days=offset)).isoformat() for offset in range(7)]
+    monday = days[0]
+    assert monday["booked"] == 3
+    assert [(slot["time"], slot["free"]) for slot in monday["slots"]] == [("09:00", 0), ("11:00", 2), ("14:00", 1), ("16:00", 2)]
+    assert days[6] == {"date": SUNDAY.isoformat(), "booked": 0, "capacity": 0, "slots": []}
+
+def test_availability_is_capped_by_the_day(bookings):
+    bookings[at(MONDAY, "09:00")] = 2
+    bookings[at(MONDAY, "11:00")] = 2
+    bookings[at(MONDAY, "14:00")] = 1
+    monday = asyncio.run(availability(FakeSession(), MONDAY, MONDAY))[0]
+    # One place is left in the day even though 16:00 itself has room for two
+    assert [slot["free"] for slot in monday["slots"]] == [0, 0, 1, 1]
+
+def test_reserve_free_slot_takes_the_day_lock(bookings):
+    session = FakeSession()
+    asyncio.run(reserve_slot(session, at(MONDAY, "11:00")))
+    (statement, params), = session.executed
+    assert "pg_advisory_xact_lock" in statement
+    assert params == {"namespace": booking.BOOKING_LOCK_NAMESPACE, "day": MONDAY.toordinal()}
+
+def test_reserve_accepts_other_timezones(bookings):
+    asyncio.run(reserve_slot(FakeSession(), at(MONDAY, "11:00").astimezone(timezone.utc)))
+
+@pytest.mark.parametrize("booking_at", [
+    at(MONDAY, "10:00"),
+    at(SUNDAY, "11:00"),
+    at(date.today() - timedelta(days=7 + date.today().weekday()), "11:00"),
+])
+def test_reserve_rejects_off_grid_and_past(bookings, booking_at):
+    session = FakeSession()
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(reserve_slot(session, booking_at))
+    assert error.value.status_code == 422
+    assert session.executed == []
+
+def test_reserve_rejects_full_slot(bookings):
+    bookings[at(MONDAY, "11:00")] = 2
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(reserve_slot(FakeSession(), at(MONDAY, "11:00")))
+    assert error.value.status_code == 409
+
+def test_reserve_rejects_full_day(bookings):
+    bookings[at(MONDAY, "09:00")] = 2
+    bookings[at(MONDAY, "14:00")] = 2
+    bookings[at(MONDAY, "16:00")] = 2
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(reserve_slot(FakeSession(), at(MONDAY, "11:00")))
+    assert error.value.status_code == 409
+
+def test_reserve_ignores_other_days(bookings):
+    bookings[at(MONDAY + timedelta(days=1), "11:00")] = 2
+    asyncio.run(reserve_slot(FakeSession(), at(MONDAY, "11:00")))
@@ -0,0 +1,24 @@
+import pytest
+from app.core.phone import normalize_phone
+
+@pytest.mark.parametrize("phone, expected", [
+    ("+998 90 123 45 67", "+998901234567"),
+    ("998901234567", "+998901234567"),
+    ("90 123-45-67", "+998901234567"),
+    ("(90) 1234567", "+998901234567"),
+    # Old domestic trunk prefix
+    ("8 (90) 123 45 67", "+998901234567"),
+    # Other countries keep their code
+    ("+7 912 345 67 89", "+79123456789"),
+    ("+1 (415) 555-0100", "+14155550100"),
+])
+def test_normalize_phone(phone, expected):
+    assert normalize_phone(phone) == expected
+
+@pytest.mark.parametrize("phone", [None, "", "   ", "@username", "12345", "+1234567890123456"])
+def test_no_usable_number(phone):
+    assert normalize_phone(phone) is None
+
+def test_formats_of_one_number_agree():
+    variants = ["+998901234567", "90 123 45 67", "8 90 123 45 67", "998-90-123-45-67"]
+    assert len({normalize_phone(variant) for variant in variants}) == 1
@@ -0,0 +1,62 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import pytest
+from app.core.scheduler import CronSchedule
+
+TZ = ZoneInfo("Asia/Tashkent")
+
+@pytest.mark.parametrize("value, low, high, expected", [
+    ("*", 0, 6, set(range(0, 7))),
+    ("*/15", 0, 59, {0, 15, 30, 45}),
+    ("5", 0, 59, {5}),
+    ("1-5", 0, 6, {1, 2, 3, 4, 5}),
+    ("10-20/5", 0, 59, {10, 15, 20}),
+    ("1,15,30", 1, 31, {1, 15, 30}),
+    # A stepped single value runs to the end of the field
+    ("5/15", 0, 59, {5, 20, 35, 50}),
+    ("22/1", 0, 23, {22, 23}),
+    ("1/2,0", 0, 6, {0, 1, 3, 5}),
+])
+def test_parse_field(value, low, high, expected):
+    assert CronSchedule._parse(value, low, high) == expected
+
+@pytest.mark.parametrize("expression", [
+    "* * * *",
+    "60 * * * *",
+    "* 24 * * *",
+    "* * 0 * *",
+    "5-1 * * * *",
+    "*/0 * * * *",
+    "70/5 * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+def test_next_after_every_ten_minutes():
+    schedule = CronSchedule("*/10 * * * *")
+    assert schedule.next_after(datetime(2026, 3, 1, 9, 0, 30, tzinfo=TZ)) == datetime(2026, 3, 1, 9, 10, tzinfo=TZ)
+
+def test_next_after_is_strictly_after():
+    schedule = CronSchedule("0 9 * * *")
+    assert schedule.next_after(datetime(2026, 3, 1, 9, 0, tzinfo=TZ)) == datetime(2026, 3, 2, 9, 0, tzinfo=TZ)
+
+def test_next_after_stepped_start():
+    schedule = CronSchedule("5/20 * * * *")
+    assert schedule.next_after(datetime(2026, 3, 1, 9, 30, tzinfo=TZ)) == datetime(2026, 3, 1, 9, 45, tzinfo=TZ)
+    assert schedule.next_after(datetime(2026, 3, 1, 9, 45, tzinfo=TZ)) == datetime(2026, 3, 1, 10, 5, tzinfo=TZ)
+
+def test_next_after_rolls_over_month_and_year():
+    schedule = CronSchedule("0 0 1 1 *")
+    assert schedule.next_after(datetime(2026, 3, 1, 0, 0, tzinfo=TZ)) == datetime(2027, 1, 1, 0, 0, tzinfo=TZ)
+
+def test_day_of_month_or_day_of_week():
+    # Both restricted: either one matching is enough, like cron
+    schedule = CronSchedule("0 12 13 * 5")
+    # 2026-03-06 is a Friday, 2026-03-13 is the 13th (also a Friday)
+    assert schedule.next_after(datetime(2026, 3, 1, 0, 0, tzinfo=TZ)) == datetime(2026, 3, 6, 12, 0, tzinfo=TZ)
+
+def test_day_of_week_only():
+    # 0 is Sunday; 2026-03-01 is a Sunday
+    schedule = CronSchedule("30 8 * * 0")
+    assert schedule.next_after(datetime(2026, 3, 1, 9, 0, tzinfo=TZ)) == datetime(2026, 3, 8, 8, 30, tzinfo=TZ)
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.core.config import settings
+from app.features.stories.repository import active_clause
+from app.features.stories.router import parse_datetimes
+from app.features.stories.service import story_ttl
+
+NOW = datetime(2026, 11, 3, 12, 0, tzinfo=timezone.utc)
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-11-03T12:00:00Z", datetime(2026, 11, 3, 12, 0, tzinfo=timezone.utc)),
+    ("2026-11-03T17:00:00+05:00", datetime(2026, 11, 3, 12, 0, tzinfo=timezone.utc)),
+    # Naive strings are taken as UTC, like the stored values
+    ("2026-11-03T12:00:00", datetime(2026, 11, 3, 12, 0, tzinfo=timezone.utc)),
+])
+def test_parse_datetimes(value, expected):
+    data = parse_datetimes({"createdAt": value, "expiresAt": value, "archivedAt": value})
+    assert data == {"createdAt": expected, "expiresAt": expected, "archivedAt": expected}
+    assert all(parsed.tzinfo is not None for parsed in data.values())
+
+def test_parse_datetimes_drops_invalid_strings():
+    assert parse_datetimes({"id": "s1", "createdAt": "yesterday", "expiresAt": None}) == {"id": "s1", "expiresAt": None}
+
+@pytest.mark.parametrize("hours, expected", [(24, timedelta(hours=24)), (0, None)])
+def test_story_ttl(monkeypatch, hours, expected):
+    monkeypatch.setattr(settings, "STORY_TTL_HOURS", hours)
+    assert story_ttl() == expected
+
+def compiled(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+def test_active_clause_with_ttl():
+    sql = compiled(active_clause(NOW, timedelta(hours=24)))
+    assert "stories.\"archivedAt\" IS NULL" in sql
+    assert "stories.\"expiresAt\" IS NULL AND stories.\"createdAt\" > '2026-11-02 12:00:00+00:00'" in sql
+
+def test_active_clause_without_ttl_keeps_stories_without_expiry():
+    sql = compiled(active_clause(NOW, None))
+    assert "stories.\"expiresAt\" IS NULL OR stories.\"expiresAt\" > '2026-11-03 12:00:00+00:00'" in sql
+    assert "createdAt" not in sql
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.core.sync import check_if_match, conditional_merge, content_hash
+from app.features.catalog.models import CatalogItem
+
+def row(version: int = 7):
+    return SimpleNamespace(version=version)
+
+@pytest.mark.parametrize("if_match", [None, '"7"', "W/\"7\"", '"3", "7"', "*"])
+def test_if_match_passes(if_match):
+    check_if_match(row(7), if_match)
+
+def test_no_header_on_missing_row():
+    check_if_match(None, None)
+
+@pytest.mark.parametrize("if_match", ['"6"', '"70"', "W/\"8\""])
+def test_stale_version_is_rejected_with_current_etag(if_match):
+    with pytest.raises(HTTPException) as error:
+        check_if_match(row(7), if_match)
+    assert error.value.status_code == 412
+    assert error.value.headers == {"ETag": '"7"'}
+
+@pytest.mark.parametrize("if_match", ['"7"', "*"])
+def test_missing_row_fails_any_precondition(if_match):
+    with pytest.raises(HTTPException) as error:
+        check_if_match(None, if_match)
+    assert error.value.status_code == 412
+    assert error.value.headers is None
+
+class FakeSession:
+    """ The AsyncSession calls conditional_merge makes, over one stored row """
+    def __init__(self, stored=None):
+        self.stored = stored
+        self.get_options = None
+        self.merged = None
+
+    async def get(self, model, id, **options):
+        self.get_options = options
+        return self.stored if self.stored is not None and self.stored.id == id else None
+
+    async def merge(self, instance):
+        self.merged = instance
+        return instance
+
+def stored_item(**values):
+    item = CatalogItem(id="c1", category="materials", title={"ru": "Плитка"}, price=100.0, **values)
+    item.version = 7
+    return item
+
+def test_conditional_merge_locks_the_row():
+    session = FakeSession(stored_item())
+    asyncio.run(conditional_merge(session, CatalogItem, {"id": "c1", "price": 120.0}, '"7"'))
+    assert session.get_options["with_for_update"] is True
+
+def test_conditional_merge_skips_unchanged_payload():
+    stored = stored_item()
+    session = FakeSession(stored)
+    # 100 and 100.0 hash the same, like a client echoing the row back
+    item, changed = asyncio.run(conditional_merge(session, CatalogItem, {"id": "c1", "price": 100, "title": {"ru": "Плитка"}}))
+    assert (item, changed) == (stored, False)
+    assert session.merged is None
+
+def test_conditional_merge_writes_changes():
+    session = FakeSession(stored_item())
+    item, changed = asyncio.run(conditional_merge(session, CatalogItem, {"id": "c1", "price": 120.0}, '"7"'))
+    assert changed is True
+    assert item.price == 120.0
+
+def test_conditional_merge_rejects_stale_version():
+    session = FakeSession(stored_item())
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(conditional_merge(session, CatalogItem, {"id": "c1", "price": 120.0}, '"6"'))
+    assert error.value.status_code == 412
+    assert session.merged is None
+
+def test_conditional_merge_inserts_new_row():
+    session = FakeSession()
+    item, changed = asyncio.run(conditional_merge(session, CatalogItem, {"id": "c2", "price": 10.0}))
+    assert changed is True
+    assert session.merged is item
+
+def test_content_hash_ignores_managed_fields():
+    values = {"id": "c1", "price": 100.0, "title": {"ru": "Плитка"}}
+    assert content_hash(CatalogItem, values) == content_hash(CatalogItem, {**values, "version": 9, "updatedAt": None, "xidHorizon": 5})
+    assert content_hash(CatalogItem, values) != content_hash(CatalogItem, {**values, "price": 101.0})
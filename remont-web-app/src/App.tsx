@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Header } from './components/layout/Header';
 import { BottomNav } from './components/layout/BottomNav';
 import { HomeScreen } from './components/screens/HomeScreen';
@@ -14,6 +14,7 @@ import { PortfolioDetailScreen } from './components/screens/PortfolioDetailScree
 import { translations, Language } from './utils/translations';
 import { Lead, Story, Project, PortfolioItem, ServiceCategory, CatalogItem, AppUser } from './utils/types';
 import { INITIAL_CALCULATOR_PRICES } from './utils/constants';
+import { apiFetch } from './utils/api';
 import { Toaster, toast } from 'sonner';
 
 // Admin Components
@@ -29,6 +30,9 @@ import { AdminCatalog } from './components/admin/screens/AdminCatalog';
 import { AdminUsers } from './components/admin/screens/AdminUsers';
 import { Lock, ArrowLeft } from 'lucide-react';
 
+// 412 on a conditional admin edit
+const CONFLICT_MESSAGE = 'Данные уже изменил другой администратор, список обновлён';
+
 export default function App() {
   const [lang, setLang] = useState<Language>('ru');
 
@@ -58,6 +62,9 @@ export default function App() {
 
   // Stories State
   const [stories, setStories] = useState<Story[]>([]);
+  // Admin copy: every non-archived story. /stories/batch deletes what is missing from
+  // the list, so it must never be fed the public feed (capped, expired ones left out)
+  const [adminStories, setAdminStories] = useState<Story[] | null>(null);
 
   // Projects State
   const [projects, setProjects] = useState<Project[]>([]);
@@ -77,6 +84,9 @@ export default function App() {
   // User State
   const [tgUser, setTgUser] = useState<any>(null);
 
+  // Delta sync cursors (highest row version loaded) for the live admin updates
+  const syncCursors = useRef<Record<string, number>>({});
+
   const API_BASE_URL = (
     window.location.hostname === 'localhost' ||
     window.location.hostname === '127.0.0.1' ||
@@ -135,7 +145,7 @@ export default function App() {
   const handleRegisterUser = async (user: any) => {
     try {
       console.log("Registering user:", user);
-      const res = await fetch(`${API_BASE_URL}/users/register`, {
+      const res = await apiFetch(`${API_BASE_URL}/users/register`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
@@ -161,38 +171,46 @@ export default function App() {
   };
 
   // --- Backend Sync Logic ---
+  const reloadFeature = async (path: string, setState: React.Dispatch<any>) => {
+    const res = await apiFetch(`${API_BASE_URL}/${path}/`);
+    if (res.ok) {
+      const data = await res.json();
+      if (Array.isArray(data)) {
+        setState(data);
+        syncCursors.current[path] = Math.max(0, ...data.map((item: any) => item.version ?? 0));
+      }
+    }
+  };
+
   useEffect(() => {
     const initData = async () => {
       try {
         const url = API_BASE_URL;
 
-        const settingsRes = await fetch(`${url}/settings/`);
-        const settingsData = await settingsRes.json();
-        if (settingsData.length === 0 || !Array.isArray(settingsData[0]?.prices)) {
-          await fetch(`${url}/settings/`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ id: 1, prices: INITIAL_CALCULATOR_PRICES }) });
-          setCalculatorPrices(INITIAL_CALCULATOR_PRICES);
-        } else {
-          setCalculatorPrices(settingsData[0].prices);
-        }
-
-        const fetchFeature = async (path: string, setState: React.Dispatch<any>) => {
-          const res = await fetch(`${url}/${path}/`);
-          if (res.ok) {
-            const data = await res.json();
-            if (Array.isArray(data)) {
-              setState(data);
-            }
+        // Public content comes in one request: settings, stories, portfolio, services, catalog
+        const loadBootstrap = async () => {
+          const res = await apiFetch(`${url}/bootstrap/`);
+          if (!res.ok) throw new Error(`bootstrap ${res.status}`);
+          const data = await res.json();
+
+          const settingsData = data.settings;
+          if (settingsData.length === 0 || !Array.isArray(settingsData[0]?.prices)) {
+            await apiFetch(`${url}/settings/`, { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify({ id: 1, prices: INITIAL_CALCULATOR_PRICES }) });
+            setCalculatorPrices(INITIAL_CALCULATOR_PRICES);
+          } else {
+            setCalculatorPrices(settingsData[0].prices);
           }
+          setStories(data.stories);
+          setPortfolio(data.portfolio);
+          setServices(data.services);
+          setCatalog(data.catalog);
         };
 
         await Promise.all([
-          fetchFeature('leads', setLeads),
-          fetchFeature('stories', setStories),
-          fetchFeature('projects', setProjects),
-          fetchFeature('portfolio', setPortfolio),
-          fetchFeature('services', setServices),
-          fetchFeature('catalog', setCatalog),
-          fetchFeature('users', setUsers)
+          loadBootstrap(),
+          reloadFeature('leads', setLeads),
+          reloadFeature('projects', setProjects),
+          reloadFeature('users', setUsers)
         ]);
 
       } catch (error) {
@@ -206,6 +224,74 @@ export default function App() {
     initData();
   }, [API_BASE_URL]);
 
+  // --- Admin stories: the unfiltered list ---
+  useEffect(() => {
+    if (viewMode !== 'admin') return;
+    const loadAdminStories = async () => {
+      try {
+        const res = await apiFetch(`${API_BASE_URL}/stories/?include_expired=true`);
+        if (!res.ok) throw new Error(`stories ${res.status}`);
+        const data = await res.json();
+        setAdminStories(data.filter((story: any) => !story.archivedAt));
+      } catch (e) {
+        console.error('Failed to load stories for the admin panel', e);
+      }
+    };
+    loadAdminStories();
+  }, [viewMode, API_BASE_URL]);
+
+  // --- Live admin updates (Server-Sent Events) ---
+  // Events only say what changed; the rows themselves come from the /changes delta endpoints
+  useEffect(() => {
+    if (viewMode !== 'admin') return;
+
+    const catchUp = async (feature: 'leads' | 'projects', setState: React.Dispatch<React.SetStateAction<any[]>>) => {
+      let since = syncCursors.current[feature] ?? 0;
+      while (true) {
+        const res = await apiFetch(`${API_BASE_URL}/${feature}/changes?since=${since}`);
+        if (!res.ok) return;
+        const page = await res.json();
+        const changed = new Map<any, any>(page.changes.map((row: any) => [row.id, row]));
+        const deleted = new Set<string>(page.deleted);
+        setState((prev: any[]) => {
+          const known = new Set(prev.map(item => item.id));
+          const added = page.changes.filter((row: any) => !known.has(row.id));
+          const kept = prev
+            .filter(item => !deleted.has(String(item.id)))
+            .map(item => changed.get(item.id) ?? item);
+          return [...added, ...kept];
+        });
+        const advanced = page.version !== since;
+        since = page.version;
+        syncCursors.current[feature] = since;
+        if (!page.hasMore || !advanced) return;
+      }
+    };
+
+    // One catch-up at a time per feature, events arriving meanwhile are covered by the next one
+    const pending: Record<string, Promise<void>> = {};
+    const sync = (feature: 'leads' | 'projects', setState: React.Dispatch<React.SetStateAction<any[]>>) => {
+      pending[feature] = (pending[feature] ?? Promise.resolve())
+        .then(() => catchUp(feature, setState))
+        .catch(e => console.error(`Live ${feature} sync failed`, e));
+    };
+
+    const source = new EventSource(`${API_BASE_URL}/events/`);
+    ['lead.created', 'lead.status_changed', 'lead.updated'].forEach(type =>
+      source.addEventListener(type, () => sync('leads', setLeads))
+    );
+    ['project.created', 'project.payment_added', 'project.updated', 'project.deleted'].forEach(type =>
+      source.addEventListener(type, () => sync('projects', setProjects))
+    );
+    source.addEventListener('lead.created', () => toast.success('Новая заявка'));
+    // Events were missed (server restart, slow connection): catch up on everything
+    source.addEventListener('reset', () => {
+      sync('leads', setLeads);
+      sync('projects', setProjects);
+    });
+    return () => source.close();
+  }, [viewMode, API_BASE_URL]);
+
   // --- Client Navigation ---
   const handleClientNavigate = (tab: string, params?: any) => {
     if (tab === 'project_detail') {
@@ -251,25 +337,46 @@ export default function App() {
   );
 
   // --- Lead Management ---
-  const handleSubmitLead = async (lead: Lead) => {
+  // Resolves to false when the lead was not saved; the user has been told why.
+  // `ifMatch` (the version the edit was based on) makes an admin edit conditional
+  const handleSubmitLead = async (lead: Lead, ifMatch?: number): Promise<boolean> => {
+    const errors = translations[lang].booking.errors;
     try {
-      await fetch(`${API_BASE_URL}/leads/`, {
+      const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+      if (ifMatch !== undefined) headers['If-Match'] = `"${ifMatch}"`;
+      const res = await apiFetch(`${API_BASE_URL}/leads/`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers,
         body: JSON.stringify(lead)
       });
+      if (res.status === 412) {
+        toast.error(CONFLICT_MESSAGE);
+        await reloadFeature('leads', setLeads);
+        return false;
+      }
+      if (!res.ok) {
+        const message = res.status === 409 ? errors.slot_taken
+          : res.status === 422 ? errors.invalid
+          : res.status === 429 ? errors.rate_limited
+          : errors.failed;
+        toast.error(message);
+        return false;
+      }
+      const { version } = await res.json();
+      const saved = { ...lead, version };
       setLeads((prev: Lead[]) => {
         // If lead already exists (by ID), update it, otherwise prepend
         const exists = prev.some(l => l.id === lead.id);
         if (exists) {
-          return prev.map(l => l.id === lead.id ? lead : l);
+          return prev.map(l => l.id === lead.id ? saved : l);
         }
-        return [lead, ...prev];
+        return [saved, ...prev];
       });
+      return true;
     } catch (e) {
       console.error('Error posting lead:', e);
-      // Fallback to local state if backend is down
-      setLeads((prev: Lead[]) => [lead, ...prev]);
+      toast.error(errors.failed);
+      return false;
     }
   };
 
@@ -277,7 +384,7 @@ export default function App() {
     const lead = leads.find((l: Lead) => l.id === leadId);
     if (lead) {
       const updatedLead = { ...lead, status };
-      await handleSubmitLead(updatedLead);
+      await handleSubmitLead(updatedLead, lead.version);
     }
   };
 
@@ -318,7 +425,7 @@ export default function App() {
         // Perform background sync to backend
         Promise.resolve().then(async () => {
           try {
-            await fetch(`${API_BASE_URL}/${endpoint}`, {
+            await apiFetch(`${API_BASE_URL}/${endpoint}`, {
               method: 'POST',
               headers: { 'Content-Type': 'application/json' },
               body: JSON.stringify(isBatch ? newValue : { id: 1, prices: newValue }),
@@ -333,9 +440,41 @@ export default function App() {
     };
   };
 
-  const proxySetProjects = createProxySetter(setProjects, 'projects/batch');
+  // Projects are saved one by one with If-Match, so two admins editing the same
+  // project get a conflict instead of silently overwriting each other
+  const saveProject = async (project: Project, ifMatch?: number) => {
+    const headers: Record<string, string> = { 'Content-Type': 'application/json' };
+    if (ifMatch !== undefined) headers['If-Match'] = `"${ifMatch}"`;
+    try {
+      const res = await apiFetch(`${API_BASE_URL}/projects/`, { method: 'POST', headers, body: JSON.stringify(project) });
+      if (res.status === 412) {
+        toast.error(CONFLICT_MESSAGE);
+        await reloadFeature('projects', setProjects);
+        return;
+      }
+      if (!res.ok) throw new Error(`projects ${res.status}`);
+      const { version } = await res.json();
+      setProjects(prev => prev.map(p => p.id === project.id ? { ...p, version } : p));
+    } catch (e) {
+      console.error('Failed to save project:', e);
+      toast.error('Не удалось сохранить проект');
+    }
+  };
+
+  const proxySetProjects: React.Dispatch<React.SetStateAction<Project[]>> = (action) => {
+    setProjects(prev => {
+      const next = typeof action === 'function' ? action(prev) : action;
+      const previous = new Map(prev.map(p => [p.id, p]));
+      Promise.resolve().then(() => Promise.all(
+        next
+          .filter(project => previous.get(project.id) !== project)
+          .map(project => saveProject(project, previous.get(project.id)?.version))
+      ));
+      return next;
+    });
+  };
   const proxySetPortfolio = createProxySetter(setPortfolio, 'portfolio/batch');
-  const proxySetStories = createProxySetter(setStories, 'stories/batch');
+  const proxySetStories = createProxySetter(setAdminStories as React.Dispatch<React.SetStateAction<Story[]>>, 'stories/batch');
   const proxySetServices = createProxySetter(setServices, 'services/batch');
   const proxySetCatalog = createProxySetter(setCatalog, 'catalog/batch');
   const proxySetPrices = createProxySetter(setCalculatorPrices, 'settings/', false);
@@ -347,7 +486,9 @@ export default function App() {
       case 'users': return <AdminUsers lang={lang} users={users} />;
       case 'projects': return <AdminProjects lang={lang} projects={projects} onUpdateProjects={proxySetProjects} users={users} />;
       case 'portfolio': return <AdminPortfolio lang={lang} portfolio={portfolio} onUpdatePortfolio={proxySetPortfolio} />;
-      case 'stories': return <AdminStories lang={lang} stories={stories} onUpdateStories={proxySetStories} />;
+      case 'stories': return adminStories === null
+        ? <div className="flex items-center justify-center h-64 text-slate-400">Загрузка...</div>
+        : <AdminStories lang={lang} stories={adminStories} onUpdateStories={proxySetStories} />;
       case 'catalog': return <AdminCatalog lang={lang} catalog={catalog} onUpdateCatalog={proxySetCatalog} />;
       case 'services': return <AdminServices lang={lang} categories={services} onUpdateCategories={proxySetServices} />;
       case 'settings': return <AdminSettings lang={lang} prices={calculatorPrices} onUpdatePrices={proxySetPrices} />;
@@ -528,6 +669,7 @@ export default function App() {
               onNavigate={handleClientNavigate}
               onSubmitLead={handleSubmitLead}
               tgUser={tgUser}
+              apiBaseUrl={API_BASE_URL}
             />
           )}
           {!['home', 'calc', 'services', 'catalog', 'product_detail', 'portfolio', 'portfolio_detail', 'project_detail', 'dashboard', 'booking'].includes(activeTab) && (
@@ -2,6 +2,10 @@ import React, { useState, useRef } from 'react';
 import { Upload, X, ImageIcon, Loader2, Video, FileText, Play } from 'lucide-react';
 import { toast } from 'sonner';
 
+const RESUMABLE_THRESHOLD = 8 * 1024 * 1024;
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+
 interface MediaUploadProps {
     onUpload: (urls: string[]) => void;
     values?: string[];
@@ -24,41 +28,108 @@ export const MediaUpload: React.FC<MediaUploadProps> = ({
         ? '/api/v1'
         : 'https://api.vicasa.uz/api/v1';
 
+    // Large files (site videos) go through resumable uploads: chunks are sent one by one
+    // and an interrupted upload continues from the offset the server has stored
+    const uploadResumable = async (file: File): Promise<string> => {
+        const sessionKey = `upload:${file.name}:${file.size}:${file.lastModified}`;
+        const uploadUrl = (id: string) => `${API_BASE_URL}/media/uploads/${id}`;
+        const storedOffset = async (id: string) => {
+            const head = await fetch(uploadUrl(id), { method: 'HEAD' });
+            return head.ok ? Number(head.headers.get('Upload-Offset')) : null;
+        };
+
+        let id = localStorage.getItem(sessionKey);
+        let offset = id ? await storedOffset(id) : null;
+        if (!id || offset === null) {
+            const created = await fetch(`${API_BASE_URL}/media/uploads`, {
+                method: 'POST',
+                headers: {
+                    'Upload-Length': String(file.size),
+                    'Upload-Metadata': `filename ${btoa(unescape(encodeURIComponent(file.name)))}`,
+                },
+            });
+            if (!created.ok) throw new Error();
+            id = (await created.json()).id as string;
+            offset = 0;
+            localStorage.setItem(sessionKey, id);
+        }
+
+        let retries = 0;
+        while (true) {
+            try {
+                const response = await fetch(uploadUrl(id), {
+                    method: 'PATCH',
+                    headers: {
+                        'Upload-Offset': String(offset),
+                        'Content-Type': 'application/offset+octet-stream',
+                    },
+                    body: file.slice(offset, offset + UPLOAD_CHUNK_SIZE),
+                });
+                if (!response.ok) throw new Error(String(response.status));
+                const data = await response.json();
+                offset = data.offset as number;
+                retries = 0;
+                if (data.url) {
+                    localStorage.removeItem(sessionKey);
+                    return data.url;
+                }
+            } catch (error) {
+                if (++retries > UPLOAD_MAX_RETRIES) throw error;
+                await new Promise(resolve => setTimeout(resolve, 1000 * 2 ** retries));
+                const current = await storedOffset(id).catch(() => null);
+                if (current === null) throw error;
+                offset = current;
+            }
+        }
+    };
+
+    const uploadSmall = async (small: File[]): Promise<string[]> => {
+        if (small.length === 0) return [];
+        if (!multiple) {
+            // The single endpoint expects the field name 'file'
+            const singleFormData = new FormData();
+            singleFormData.append('file', small[0]);
+            const response = await fetch(`${API_BASE_URL}/media/upload`, {
+                method: 'POST',
+                body: singleFormData,
+            });
+            if (!response.ok) throw new Error();
+            const data = await response.json();
+            return [data.url];
+        }
+        const formData = new FormData();
+        small.forEach(file => {
+            formData.append('files', file);
+        });
+        const response = await fetch(`${API_BASE_URL}/media/upload-multiple`, {
+            method: 'POST',
+            body: formData,
+        });
+        if (!response.ok) throw new Error();
+        const data = await response.json();
+        return data.urls;
+    };
+
     const handleFileChange = async (e: React.ChangeEvent<HTMLInputElement>) => {
         const files = Array.from(e.target.files || []);
         if (files.length === 0) return;
 
         // ... (truncated size check)
         setIsUploading(true);
-        const formData = new FormData();
-        files.forEach(file => {
-            formData.append('files', file);
-        });
-
         try {
-            // If single, we need to adjust the field name to 'file' for the single endpoint
+            const large = files.filter(file => file.size > RESUMABLE_THRESHOLD);
+            const small = files.filter(file => file.size <= RESUMABLE_THRESHOLD);
+            const urls = await uploadSmall(small);
+            for (const file of large) {
+                urls.push(await uploadResumable(file));
+            }
+
             if (!multiple) {
-                const singleFormData = new FormData();
-                singleFormData.append('file', files[0]);
-                const response = await fetch(`${API_BASE_URL}/media/upload`, {
-                    method: 'POST',
-                    body: singleFormData,
-                });
-                if (response.ok) {
-                    const data = await response.json();
-                    onUpload([data.url]);
-                    toast.success('Файл загружен успешно!');
-                } else throw new Error();
+                onUpload([urls[0]]);
+                toast.success('Файл загружен успешно!');
             } else {
-                const response = await fetch(`${API_BASE_URL}/media/upload-multiple`, {
-                    method: 'POST',
-                    body: formData,
-                });
-                if (response.ok) {
-                    const data = await response.json();
-                    onUpload([...values, ...data.urls]);
-                    toast.success('Файлы загружены успешно!');
-                } else throw new Error();
+                onUpload([...values, ...urls]);
+                toast.success('Файлы загружены успешно!');
             }
         } catch (error) {
             console.error('Error uploading files:', error);
@@ -1,25 +1,62 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
 import { translations, Language } from '../../utils/translations';
 import { Check, ArrowLeft, Send } from 'lucide-react';
 
 import { Lead } from '../../utils/types';
+import { apiFetch } from '../../utils/api';
 
 interface BookingScreenProps {
   lang: Language;
   onNavigate: (tab: string) => void;
-  onSubmitLead?: (lead: Lead) => void;
+  onSubmitLead?: (lead: Lead) => Promise<boolean>;
   tgUser?: any;
+  apiBaseUrl: string;
 }
 
-export const BookingScreen: React.FC<BookingScreenProps> = ({ lang, onNavigate, onSubmitLead, tgUser }) => {
+// GET /leads/slots response
+interface SlotDay {
+  date: string; // YYYY-MM-DD
+  slots: { time: string; start: string; free: number }[];
+}
+
+const SLOT_DAYS = 14;
+
+const isoDate = (day: Date) =>
+  `${day.getFullYear()}-${String(day.getMonth() + 1).padStart(2, '0')}-${String(day.getDate()).padStart(2, '0')}`;
+
+export const BookingScreen: React.FC<BookingScreenProps> = ({ lang, onNavigate, onSubmitLead, tgUser, apiBaseUrl }) => {
   const t = translations[lang].booking;
   const [submitted, setSubmitted] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
   const [name, setName] = useState(tgUser ? `${tgUser.first_name}${tgUser.last_name ? ' ' + tgUser.last_name : ''}` : '');
   const [phone, setPhone] = useState(tgUser?.username ? `@${tgUser.username}` : '');
+  const [days, setDays] = useState<SlotDay[] | null>(null);
+  const [selectedDay, setSelectedDay] = useState<string | null>(null);
+  const [selectedSlot, setSelectedSlot] = useState<{ date: string; time: string; start: string } | null>(null);
+
+  const loadSlots = async () => {
+    const from = new Date();
+    const to = new Date(from.getTime() + (SLOT_DAYS - 1) * 24 * 60 * 60 * 1000);
+    try {
+      const res = await apiFetch(`${apiBaseUrl}/leads/slots?from=${isoDate(from)}&to=${isoDate(to)}`);
+      if (!res.ok) throw new Error(`slots ${res.status}`);
+      const data: SlotDay[] = await res.json();
+      const open = data.filter(day => day.slots.some(slot => slot.free > 0));
+      setDays(open);
+      setSelectedDay(current => open.some(day => day.date === current) ? current : open[0]?.date ?? null);
+    } catch (e) {
+      console.error('Failed to load booking slots', e);
+      setDays([]);
+    }
+  };
+
+  useEffect(() => {
+    loadSlots();
+  }, [apiBaseUrl]);
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
+    if (!selectedSlot) return;
     setIsLoading(true);
 
     const now = new Date();
@@ -32,16 +69,29 @@ export const BookingScreen: React.FC<BookingScreenProps> = ({ lang, onNavigate,
       date: now.toLocaleDateString('ru-RU', { day: '2-digit', month: '2-digit', year: 'numeric' }),
       time: now.toLocaleTimeString('ru-RU', { hour: '2-digit', minute: '2-digit' }),
       notes: tgUser ? `TG ID: ${tgUser.id}${tgUser.username ? `, User: @${tgUser.username}` : ''}` : undefined,
+      // The server reserves this slot atomically: 409 when someone else was faster
+      bookingAt: selectedSlot.start,
+      bookingData: {
+        date: selectedSlot.date.split('-').reverse().join('.'),
+        time: selectedSlot.time,
+        address: '',
+      },
     };
 
-    if (onSubmitLead) {
-      await onSubmitLead(newLead);
-    }
-
+    const saved = onSubmitLead ? await onSubmitLead(newLead) : true;
     setIsLoading(false);
+    if (!saved) {
+      // Most likely the slot was taken meanwhile: show what is still free
+      setSelectedSlot(null);
+      loadSlots();
+      return;
+    }
     setSubmitted(true);
   };
 
+  const formatDay = (value: string) =>
+    new Date(`${value}T00:00:00`).toLocaleDateString(lang === 'ru' ? 'ru-RU' : lang === 'en' ? 'en-US' : 'uz-UZ', { weekday: 'short', day: 'numeric', month: 'short' });
+
   if (submitted) {
     return (
       <div className="min-h-screen flex flex-col items-center justify-center p-8 text-center bg-[#F9F9F7] animate-fade-in">
@@ -111,13 +161,52 @@ export const BookingScreen: React.FC<BookingScreenProps> = ({ lang, onNavigate,
           />
         </div>
 
+        <div>
+          <label className="block text-xs font-bold text-slate-900 mb-2 uppercase tracking-wide ml-2">{t.slot}</label>
+          {days === null ? (
+            <div className="flex justify-center py-4">
+              <div className="w-6 h-6 border-2 border-slate-200 border-t-[#FFB800] rounded-full animate-spin" />
+            </div>
+          ) : days.length === 0 ? (
+            <p className="text-sm text-slate-400 font-medium ml-2">{t.no_slots}</p>
+          ) : (
+            <>
+              <div className="flex gap-2 overflow-x-auto scrollbar-hide pb-2">
+                {days.map(day => (
+                  <button
+                    key={day.date}
+                    type="button"
+                    onClick={() => { setSelectedDay(day.date); setSelectedSlot(null); }}
+                    className={`flex-shrink-0 px-4 py-3 rounded-2xl text-sm font-bold transition-colors ${selectedDay === day.date ? 'bg-[#FFB800] text-black' : 'bg-slate-50 text-slate-600'}`}
+                  >
+                    {formatDay(day.date)}
+                  </button>
+                ))}
+              </div>
+              <div className="grid grid-cols-4 gap-2 mt-2">
+                {days.find(day => day.date === selectedDay)?.slots.map(slot => (
+                  <button
+                    key={slot.start}
+                    type="button"
+                    disabled={slot.free <= 0}
+                    onClick={() => setSelectedSlot({ date: selectedDay!, time: slot.time, start: slot.start })}
+                    className={`py-3 rounded-2xl text-sm font-bold transition-colors disabled:opacity-30 ${selectedSlot?.start === slot.start ? 'bg-[#FFB800] text-black' : 'bg-slate-50 text-slate-900'}`}
+                  >
+                    {slot.time}
+                  </button>
+                ))}
+              </div>
+            </>
+          )}
+        </div>
+
         <div className="pt-4">
           <button
             type="submit"
-            disabled={isLoading}
+            disabled={isLoading || !selectedSlot}
             className="w-full bg-[#FFB800] text-black rounded-2xl py-4 font-bold text-lg shadow-lg shadow-[#FFB800]/20 active:scale-[0.98] transition-transform disabled:opacity-70 flex items-center justify-center hover:bg-[#E5A600]"
           >
-            {isLoading ? <div className="w-6 h-6 border-2 border-white/30 border-t-white rounded-full animate-spin" /> : t.submit}
+            {isLoading ? <div className="w-6 h-6 border-2 border-white/30 border-t-white rounded-full animate-spin" /> : selectedSlot ? t.submit : t.choose_slot}
           </button>
         </div>
       </form>
@@ -6,7 +6,7 @@ import { INITIAL_CALCULATOR_PRICES, CalculatorPriceType } from '../../utils/cons
 
 interface CalculatorScreenProps {
   lang: Language;
-  onSubmitLead?: (lead: Lead) => void;
+  onSubmitLead?: (lead: Lead) => Promise<boolean>;
   prices?: CalculatorPriceType[];
   onNavigate: (tab: string, params?: any) => void;
   tgUser?: any;
@@ -71,7 +71,8 @@ export const CalculatorScreen: React.FC<CalculatorScreenProps> = ({ lang, onSubm
           estimatedCost: total
         }
       };
-      await onSubmitLead(newLead);
+      // Not saved: the error was shown, keep the form so the user can retry
+      if (!(await onSubmitLead(newLead))) return;
     }
     setShowContactModal(false);
     setShowSuccessModal(true);
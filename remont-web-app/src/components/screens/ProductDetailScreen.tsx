@@ -9,7 +9,7 @@ interface ProductDetailScreenProps {
   productId: string;
   catalog: CatalogItem[];
   tgUser?: any;
-  onSubmitLead?: (lead: Lead) => void;
+  onSubmitLead?: (lead: Lead) => Promise<boolean>;
 }
 
 import { Lead } from '../../utils/types';
@@ -44,7 +44,7 @@ export const ProductDetailScreen: React.FC<ProductDetailScreenProps> = ({ lang,
         time: now.toLocaleTimeString('ru-RU', { hour: '2-digit', minute: '2-digit' }),
         notes: `Product inquiry: ${product.title[lang]} (ID: ${product.id}). ${tgUser ? `TG User: @${tgUser.username} (ID: ${tgUser.id})` : ''}`,
       };
-      await onSubmitLead(newLead);
+      if (!(await onSubmitLead(newLead))) return;
       toast.success(t.success_inquiry, {
         description: t.success_inquiry_desc,
       });
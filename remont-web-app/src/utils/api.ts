@@ -0,0 +1,19 @@
+// Read-your-writes with a read replica: write responses carry X-Primary-Until
+// (epoch seconds) and until then reads echo it back, so the backend serves them
+// from the primary instead of a replica that may not have replayed the write yet.
+const PRIMARY_PIN_HEADER = 'X-Primary-Until';
+
+let primaryUntil = 0;
+
+export const apiFetch = async (input: string, init: RequestInit = {}): Promise<Response> => {
+    const headers = new Headers(init.headers);
+    if (primaryUntil > Date.now() / 1000) {
+        headers.set(PRIMARY_PIN_HEADER, String(primaryUntil));
+    }
+    const res = await fetch(input, { ...init, headers });
+    const pin = Number(res.headers.get(PRIMARY_PIN_HEADER));
+    if (pin > primaryUntil) {
+        primaryUntil = pin;
+    }
+    return res;
+};
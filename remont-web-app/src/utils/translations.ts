@@ -278,6 +278,15 @@ export const translations = {
       address: "Адрес объекта",
       comment: "Пожелания",
       submit: "Подтве��дить встречу",
+      slot: "Дата и время замера",
+      no_slots: "Свободных слотов нет, позвоните нам",
+      choose_slot: "Выберите время замера",
+      errors: {
+        slot_taken: "Это время уже заняли, выберите другое",
+        invalid: "Проверьте данные заявки",
+        rate_limited: "Слишком много заявок, попробуйте через минуту",
+        failed: "Не удалось отправить заявку, попробуйте еще раз",
+      },
       success: {
         title: "Заявка принята!",
         text: "Инженер свяжется с вами для подтверждения времени.",
@@ -788,6 +797,15 @@ export const translations = {
       address: "Obyekt manzili",
       comment: "Istaklar",
       submit: "Uchrashuvni tasdiqlash",
+      slot: "O'lchov sanasi va vaqti",
+      no_slots: "Bo'sh vaqt yo'q, bizga qo'ng'iroq qiling",
+      choose_slot: "O'lchov vaqtini tanlang",
+      errors: {
+        slot_taken: "Bu vaqt band bo'ldi, boshqasini tanlang",
+        invalid: "Ariza ma'lumotlarini tekshiring",
+        rate_limited: "Arizalar juda ko'p, bir daqiqadan so'ng urinib ko'ring",
+        failed: "Arizani yuborib bo'lmadi, qayta urinib ko'ring",
+      },
       success: {
         title: "Ariza qabul qilindi!",
         text: "Muhandis vaqtni tasdiqlash uchun siz bilan bog'lanadi.",
@@ -1298,6 +1316,15 @@ export const translations = {
       address: "Property Address",
       comment: "Wishes",
       submit: "Confirm Meeting",
+      slot: "Measurement date and time",
+      no_slots: "No free slots, please call us",
+      choose_slot: "Choose a measurement time",
+      errors: {
+        slot_taken: "This time was just taken, please choose another",
+        invalid: "Please check the request details",
+        rate_limited: "Too many requests, try again in a minute",
+        failed: "Could not send the request, please try again",
+      },
       success: {
         title: "Request Accepted!",
         text: "An engineer will contact you to confirm the time.",
@@ -60,6 +60,8 @@ export interface Lead {
         level: 'economy' | 'standard' | 'premium';
         estimatedCost: number;
     };
+    // Measurement slot start (ISO 8601), from GET /leads/slots
+    bookingAt?: string;
     // Booking data
     bookingData?: {
         date: string;
@@ -68,6 +70,7 @@ export interface Lead {
         comment?: string;
     };
     notes?: string;
+    version?: number; // Row version from the server, sent back as If-Match on edits
 }
 
 export interface ForemanSalaryRecord {
@@ -80,6 +83,7 @@ export interface ForemanSalaryRecord {
 
 export interface Project {
     id: string; // Changed to string for consistency
+    version?: number; // Row version from the server, sent back as If-Match on edits
     clientName: Record<Language, string> | string;
     address: Record<Language, string> | string;
     phone: string;